@@ -12,4 +12,5 @@ can extend the store module to load data from a database instead of
 the in‑memory list defined here.
 """
 
-from .router import router as catalog_router  # noqa: F401
\ No newline at end of file
+from .router import router as catalog_router  # noqa: F401
+from .store import close as close_catalog  # noqa: F401
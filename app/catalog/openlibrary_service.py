@@ -10,9 +10,17 @@ Open Library.  It exposes two primary functions:
 * ``get_book_openlibrary()`` — retrieve detailed information about a
   single work by its Open Library identifier.
 
+``search_books_openlibrary_pages()`` fetches several pages of the same
+search concurrently, for example to prefetch the pages that follow the
+one being displayed.  ``close()`` releases the HTTP client and thread
+pools at shutdown.
+
 Both functions implement simple in-memory caches to avoid repeated
-requests for the same queries or works.  Only the Python standard
-library is used for HTTP requests.  If Open Library is unreachable or
+requests for the same queries or works.  HTTP requests go through a
+single shared ``httpx.Client`` (the same library the chatbot uses),
+whose keep-alive connections are reused by every thread so that
+consecutive calls do not pay for a new TCP and TLS handshake each
+time.  If Open Library is unreachable or
 returns no results, the calling code can fall back to local sample
 data via ``_search_books_local`` in ``store.py``.
 
@@ -23,56 +31,128 @@ integrate with this FastAPI project and its schemas.
 
 from __future__ import annotations
 
+import itertools
 import json
 import logging
 import re
 import urllib.parse
-import urllib.request
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, TypeVar
+
+import httpx
 
+try:  # optional, several times faster than ``json`` on large payloads
+    import orjson
+except ImportError:  # pragma: no cover - orjson is not a hard dependency
+    orjson = None
+
+from ..cache import TTLCache
+from ..http_settings import client_options
 from .schemas import Book
 
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+T = TypeVar('T')
+
+
+# Shared HTTP client, configured like the chatbot's (``app/http_settings.py``).
+# ``httpx.Client`` is thread-safe, so FastAPI's threadpool and the pools
+# below all draw on one pool of keep-alive connections.  Redirects (at
+# most three) are followed with the scheme and port of their target.
+# It is closed by ``close()``.
+_client = httpx.Client(**client_options(), follow_redirects=True, max_redirects=3)
+
+# Small pool used to resolve the authors of a work in parallel.
+_author_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="openlibrary")
+
+# Bounded pool for concurrent page fetches (``search_books_openlibrary_pages``).
+_page_pool = ThreadPoolExecutor(max_workers=5, thread_name_prefix="openlibrary-pages")
+
+# Validators of previous responses: url -> (ETag, value built from the
+# payload).  When one of the caches below expires, the refetch is sent as
+# a conditional request and a ``304 Not Modified`` reuses the value kept
+# here, so an unchanged resource costs a header exchange instead of a
+# download, parse and conversion.  The value is the very object stored in
+# the cache below, not a copy of the payload.  Entries live longer than
+# the longest of those caches (authors, one day), otherwise they would
+# expire together and never be revalidated.
+_etag_cache = TTLCache(maxsize=8192, ttl=7 * 86400)
 
-def _http_get_json(url: str) -> Optional[dict]:
-    """Perform an HTTP GET and return parsed JSON or ``None`` on failure.
 
-    A custom User-Agent and Accept header are provided to avoid 403
-    responses from Open Library.  Network errors are logged and
-    ``None`` is returned.
+def _decode_json(body: bytes) -> Optional[dict]:
+    """Parse a JSON response body.
+
+    ``orjson`` is used when it is installed.  It rejects invalid UTF-8,
+    so such bodies, like every body when ``orjson`` is missing, go
+    through ``json`` after a lenient decode.
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(body.decode('utf-8', errors='ignore'))
+
+
+def _fetch(url: str, build: Callable[[Any], Optional[T]]) -> Optional[T]:
+    """GET ``url`` and return ``build(payload)``, or ``None`` on failure.
+
+    The request is sent through the shared ``_client``, which reuses
+    keep-alive connections and follows up to three redirects.  URLs
+    that returned an ``ETag`` before are revalidated with
+    ``If-None-Match``; on ``304 Not Modified`` the value built last time
+    is returned without calling ``build``.  Network errors and non-200
+    statuses are logged and ``None`` is returned.
     """
+    validated = _etag_cache.get(url)
+    headers = {'If-None-Match': validated[0]} if validated is not None else None
     try:
-        request = urllib.request.Request(
-            url,
-            headers={
-                'User-Agent': (
-                    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) '
-                    'AppleWebKit/537.36 (KHTML, like Gecko) '
-                    'Chrome/115.0 Safari/537.36'
-                ),
-                'Accept': 'application/json',
-            },
-        )
-        with urllib.request.urlopen(request, timeout=10) as response:
-            if response.status != 200:
-                logger.warning(
-                    "Open Library request to %s returned status %s", url, response.status
-                )
-                return None
-            data = response.read().decode('utf-8', errors='ignore')
-            return json.loads(data)
+        response = _client.get(url, headers=headers)
+        if response.status_code == 304 and validated is not None:
+            _etag_cache.set(url, validated)
+            return validated[1]
+        if response.status_code != 200:
+            logger.warning(
+                "Open Library request to %s returned status %s", url, response.status_code
+            )
+            return None
+        data = _decode_json(response.content)
     except Exception as exc:
         logger.error("Error fetching %s: %s", url, exc)
         return None
-
-
-# Caches for search queries, works and authors
-_search_cache: Dict[str, List[Book]] = {}
-_work_cache: Dict[str, Book] = {}
-_author_cache: Dict[str, str] = {}
+    value = build(data)
+    etag = response.headers.get('ETag')
+    if etag and value is not None:
+        _etag_cache.set(url, (etag, value))
+    return value
+
+
+# Caches for search queries, works and authors.  They are bounded and
+# entries expire, so a long-running server does not grow without limit
+# and stale Open Library data is eventually refreshed.
+_search_cache = TTLCache(maxsize=512, ttl=600)
+_work_cache = TTLCache(maxsize=2048, ttl=3600)
+_author_cache = TTLCache(maxsize=4096, ttl=86400)
+
+
+# ISO 639-2 (three-letter) to ISO 639-1 (two-letter) language codes.
+_LANG3TO2 = {
+    'eng': 'en', 'fre': 'fr', 'fra': 'fr', 'spa': 'es', 'ita': 'it',
+    'por': 'pt', 'ger': 'de', 'deu': 'de', 'rus': 'ru', 'jpn': 'ja',
+    'chi': 'zh', 'zho': 'zh', 'kor': 'ko', 'tur': 'tr', 'ara': 'ar',
+    'hin': 'hi', 'urd': 'ur', 'per': 'fa', 'fas': 'fa', 'pes': 'fa',
+    'dan': 'da', 'nor': 'no', 'nob': 'no', 'fin': 'fi', 'swe': 'sv',
+    'nep': 'ne', 'bul': 'bg', 'rum': 'ro', 'ron': 'ro', 'ukr': 'uk',
+    'vie': 'vi', 'cat': 'ca', 'lat': 'la', 'heb': 'he', 'gre': 'el',
+    'ell': 'el', 'gla': 'gd', 'yid': 'yi', 'lit': 'lt', 'lav': 'lv',
+    'hun': 'hu', 'ice': 'is', 'isl': 'is', 'hrv': 'hr', 'gle': 'ga',
+    'afr': 'af', 'dut': 'nl', 'nld': 'nl', 'pol': 'pl', 'cze': 'cs',
+    'ces': 'cs', 'alb': 'sq', 'ben': 'bn', 'tam': 'ta', 'tel': 'te',
+    'mar': 'mr', 'tha': 'th', 'tib': 'bo', 'grc': 'el', 'kal': 'kl',
+    'ltz': 'lb', 'wel': 'cy', 'cym': 'cy',
+}
 
 
 def _convert_language(code: str) -> str:
@@ -83,61 +163,37 @@ def _convert_language(code: str) -> str:
     """
     if not code:
         return 'fr'
-    code = code.lower()
     if len(code) == 2:
-        return code
-    mapping = {
-        'eng': 'en', 'fre': 'fr', 'fra': 'fr', 'spa': 'es', 'ita': 'it',
-        'por': 'pt', 'ger': 'de', 'deu': 'de', 'rus': 'ru', 'jpn': 'ja',
-        'chi': 'zh', 'zho': 'zh', 'kor': 'ko', 'tur': 'tr', 'ara': 'ar',
-        'hin': 'hi', 'urd': 'ur', 'per': 'fa', 'fas': 'fa', 'pes': 'fa',
-        'dan': 'da', 'nor': 'no', 'nob': 'no', 'fin': 'fi', 'swe': 'sv',
-        'nep': 'ne', 'bul': 'bg', 'rum': 'ro', 'ron': 'ro', 'ukr': 'uk',
-        'vie': 'vi', 'cat': 'ca', 'lat': 'la', 'heb': 'he', 'gre': 'el',
-        'ell': 'el', 'gla': 'gd', 'yid': 'yi', 'lit': 'lt', 'lav': 'lv',
-        'hun': 'hu', 'ice': 'is', 'isl': 'is', 'hrv': 'hr', 'gle': 'ga',
-        'afr': 'af', 'dut': 'nl', 'nld': 'nl', 'pol': 'pl', 'cze': 'cs',
-        'ces': 'cs', 'alb': 'sq', 'ben': 'bn', 'tam': 'ta', 'tel': 'te',
-        'mar': 'mr', 'tha': 'th', 'tib': 'bo', 'grc': 'el', 'kal': 'kl',
-        'ltz': 'lb', 'wel': 'cy', 'cym': 'cy',
-    }
-    return mapping.get(code, code[:2])
+        return code.lower()
+    code = code.lower()
+    return _LANG3TO2.get(code, code[:2])
+
+
+# Tokenisation helpers for ``_generate_tags``, built once at import.
+_TOKEN_RE = re.compile(r'[^\w]+')
+_STOPWORDS = frozenset({
+    'the', 'and', 'of', 'a', 'an', 'for', 'in', 'on', 'to', 'from',
+    'with', 'without', 'into', 'by', 'le', 'la', 'les', 'un', 'une',
+    'des', 'et', 'dans', 'en', 'du', 'de', 'der', 'die', 'das', 'und',
+    'el', 'los', 'las', 'y', 'del', 'por'
+})
+
 
+def _tokenize(text: str) -> List[str]:
+    """Lowercase ``text``, strip punctuation and drop stopwords."""
+    return [w for w in _TOKEN_RE.sub(' ', text.lower()).split() if w not in _STOPWORDS]
 
-def _generate_tags(title: str, subjects: List[str]) -> List[str]:
-    """Create a list of tags from the title and subject list.
+
+def _generate_tags(title: str, subjects: Iterable[str]) -> Tuple[str, ...]:
+    """Create a tuple of tags from the title and subject list.
 
     Tags are lowercased, punctuation removed, and duplicates removed
     while preserving order.  Common stopwords are excluded.  This
     heuristic helps create useful tags for the front‑end.
     """
-    import re as _re
-
-    stopwords = {
-        'the', 'and', 'of', 'a', 'an', 'for', 'in', 'on', 'to', 'from',
-        'with', 'without', 'into', 'by', 'le', 'la', 'les', 'un', 'une',
-        'des', 'et', 'dans', 'en', 'du', 'de', 'der', 'die', 'das', 'und',
-        'el', 'los', 'las', 'y', 'del', 'por'
-    }
-
-    def tokenize(text: str) -> List[str]:
-        cleaned = _re.sub(r'[^\w]+', ' ', text.lower())
-        return [w for w in cleaned.split() if w and w not in stopwords]
-
-    tokens: List[str] = []
-    seen = set()
-    # Title tokens
-    for token in tokenize(title):
-        if token not in seen:
-            seen.add(token)
-            tokens.append(token)
-    # Subject tokens
-    for subj in subjects:
-        for token in tokenize(subj):
-            if token not in seen:
-                seen.add(token)
-                tokens.append(token)
-    return tokens
+    # Title tokens first, then subject tokens; dict keys keep the first
+    # occurrence of each token in order.
+    return tuple(dict.fromkeys(itertools.chain(_tokenize(title), *map(_tokenize, subjects))))
 
 
 def _build_cover_url(cover_id: Optional[int], cover_edition_key: Optional[str]) -> Optional[str]:
@@ -159,14 +215,18 @@ def _get_author_name(author_key: str) -> Optional[str]:
         if len(parts) == 2:
             key = parts[1]
     # Cache lookup
-    if key in _author_cache:
-        return _author_cache[key]
+    cached = _author_cache.get(key)
+    if cached is not None:
+        return cached
     url = f"https://openlibrary.org/authors/{urllib.parse.quote(key)}.json"
-    data = _http_get_json(url)
-    if data and 'name' in data:
-        _author_cache[key] = data['name']
-        return data['name']
-    return None
+    name = _fetch(
+        url,
+        lambda data: data['name']
+        if isinstance(data, dict) and isinstance(data.get('name'), str) else None,
+    )
+    if name is not None:
+        _author_cache.set(key, name)
+    return name
 
 
 def search_books_openlibrary(
@@ -185,10 +245,18 @@ def search_books_openlibrary(
     ``store.py``.  When Open Library returns no results, an empty list
     is returned and callers can fall back to local data.
     """
-    # Compose a cache key including all parameters
-    cache_key = f"{q or ''}|{category or ''}|{tag or ''}|{language or ''}|{page}|{page_size}"
-    if cache_key in _search_cache:
-        return _search_cache[cache_key]
+    # Strip the inputs first so that blank or padded values neither add
+    # empty terms to the query nor produce distinct cache keys.
+    q = (q or '').strip()
+    category = (category or '').strip()
+    tag = (tag or '').strip()
+    language = (language or '').strip()
+    page = max(1, int(page))
+    page_size = max(1, int(page_size))
+    cache_key = (q, category, tag, language, page, page_size)
+    cached = _search_cache.get(cache_key)
+    if cached is not None:
+        return cached
     # Build query string.  Subjects are specified via 'subject:' terms.
     terms: List[str] = []
     if q:
@@ -197,20 +265,27 @@ def search_books_openlibrary(
         terms.append(f"subject:{category}")
     if tag:
         terms.append(f"subject:{tag}")
-    query = " ".join(terms)
-    # Build URL with pagination
+    # urlencode quotes the joined query exactly once (spaces become '+').
     params = {
-        'q': query,
-        'limit': max(1, int(page_size)),
-        'page': max(1, int(page)),
+        'q': " ".join(terms),
+        'limit': page_size,
+        'page': page,
     }
     if language:
         params['lang'] = language
     url = f"https://openlibrary.org/search.json?{urllib.parse.urlencode(params)}"
-    data = _http_get_json(url)
+    books = _fetch(url, _books_from_search)
+    if books is None:
+        books = []
+    # Cache and return
+    _search_cache.set(cache_key, books)
+    return books
+
+
+def _books_from_search(data: Any) -> List[Book]:
+    """Map the ``docs`` of a search response to ``Book`` instances."""
     books: List[Book] = []
     if not data or 'docs' not in data:
-        _search_cache[cache_key] = books
         return books
     docs = data.get('docs') or []
     for doc in docs:
@@ -218,23 +293,33 @@ def search_books_openlibrary(
         if not key or not isinstance(key, str):
             continue
         work_id = key.split('/')[-1]
-        title = doc.get('title') or doc.get('title_suggest') or ''
-        authors = doc.get('author_name') or []
+        title = next(
+            (t for t in (doc.get('title'), doc.get('title_suggest')) if t and isinstance(t, str)),
+            '',
+        )
+        authors_raw = doc.get('author_name') or []
+        if isinstance(authors_raw, str):
+            authors_raw = [authors_raw]
+        authors = [a for a in authors_raw if isinstance(a, str)]
         author_str = ", ".join(authors) if authors else ''
         cover_id = doc.get('cover_i')
+        if not isinstance(cover_id, int) or isinstance(cover_id, bool):
+            cover_id = None
         cover_edition_key = doc.get('cover_edition_key')
+        if not isinstance(cover_edition_key, str):
+            cover_edition_key = None
         cover_url = _build_cover_url(cover_id, cover_edition_key) or ''
         # Subjects may be under 'subject' or 'subject_facet'
         subjects_raw = doc.get('subject') or doc.get('subject_facet') or []
         if isinstance(subjects_raw, str):
-            subjects_list = [subjects_raw]
+            subjects_list = (subjects_raw,)
         else:
-            subjects_list = [s for s in subjects_raw if isinstance(s, str)]
+            subjects_list = tuple(s for s in subjects_raw if isinstance(s, str))
         tags = _generate_tags(title, subjects_list)
         # Language conversion
         lang = 'fr'
         codes = doc.get('language') or []
-        if codes:
+        if isinstance(codes, list) and codes and isinstance(codes[0], str):
             lang = _convert_language(codes[0])
         # Year
         year_val = doc.get('first_publish_year')
@@ -248,8 +333,9 @@ def search_books_openlibrary(
         ratings_count = 0
         if 'ratings_count' in doc and isinstance(doc['ratings_count'], int):
             ratings_count = doc['ratings_count']
+        # Every field has been type-checked above, so skip validation
         books.append(
-            Book(
+            Book.model_construct(
                 id=work_id,
                 title=title,
                 author=author_str,
@@ -264,35 +350,91 @@ def search_books_openlibrary(
                 web_reader_link=None,
             )
         )
-    # Cache and return
-    _search_cache[cache_key] = books
     return books
 
 
+def search_books_openlibrary_pages(
+    pages: Iterable[int],
+    q: Optional[str] = None,
+    category: Optional[str] = None,
+    tag: Optional[str] = None,
+    language: Optional[str] = None,
+    sort: str = "relevance",
+    page_size: int = 12,
+) -> Dict[int, List[Book]]:
+    """Fetch several result pages of the same search concurrently.
+
+    Each page goes through ``search_books_openlibrary()``, so results
+    land in ``_search_cache`` and later single-page calls are served
+    from memory.  At most five pages are requested at the same time.
+    Returns a mapping of page number to the books on that page.
+    """
+    futures = {
+        p: _page_pool.submit(
+            search_books_openlibrary,
+            q=q,
+            category=category,
+            tag=tag,
+            language=language,
+            sort=sort,
+            page=p,
+            page_size=page_size,
+        )
+        for p in sorted({max(1, int(p)) for p in pages})
+    }
+    return {p: future.result() for p, future in futures.items()}
+
+
+def _work_id(book_id: str) -> str:
+    """Return the bare work ID of ``book_id`` (e.g. from ``/works/OL1W``)."""
+    work_id = book_id.strip()
+    if '/' in work_id:
+        work_id = work_id.split('/')[-1]
+    return work_id
+
+
+def get_cached_book_openlibrary(book_id: str) -> Optional[Book]:
+    """Return the work cached by ``get_book_openlibrary()``, without fetching."""
+    if not book_id:
+        return None
+    return _work_cache.get(_work_id(book_id))
+
+
 def get_book_openlibrary(book_id: str) -> Optional[Book]:
     """Return detailed metadata for a work ID from Open Library."""
     if not book_id:
         return None
-    work_id = book_id.strip()
-    if '/' in work_id:
-        work_id = work_id.split('/')[-1]
-    if work_id in _work_cache:
-        return _work_cache[work_id]
+    work_id = _work_id(book_id)
+    cached = _work_cache.get(work_id)
+    if cached is not None:
+        return cached
     url = f"https://openlibrary.org/works/{urllib.parse.quote(work_id)}.json"
-    data = _http_get_json(url)
+    book = _fetch(url, lambda data: _book_from_work(work_id, data))
+    if book is not None:
+        _work_cache.set(work_id, book)
+    return book
+
+
+def _book_from_work(work_id: str, data: Any) -> Optional[Book]:
+    """Build a ``Book`` from a work payload, resolving its authors."""
     if not data:
         return None
-    title = data.get('title', '')
-    # Resolve authors
-    author_names: List[str] = []
+    title = data.get('title') or ''
+    if not isinstance(title, str):
+        title = ''
+    # Resolve authors.  When a work has several authors the lookups run
+    # in parallel instead of one round-trip after the other.
+    author_keys: List[str] = []
     for entry in data.get('authors') or []:
         if isinstance(entry, dict):
             ainfo = entry.get('author')
-            if ainfo and isinstance(ainfo, dict):
-                key = ainfo.get('key')
-                name = _get_author_name(key)
-                if name:
-                    author_names.append(name)
+            if ainfo and isinstance(ainfo, dict) and isinstance(ainfo.get('key'), str):
+                author_keys.append(ainfo['key'])
+    if len(author_keys) > 1:
+        resolved = list(_author_pool.map(_get_author_name, author_keys))
+    else:
+        resolved = [_get_author_name(key) for key in author_keys]
+    author_names = [name for name in resolved if name]
     author_str = ", ".join(author_names) if author_names else ''
     # Description or excerpt
     desc = data.get('description')
@@ -316,7 +458,7 @@ def get_book_openlibrary(book_id: str) -> Optional[Book]:
         if isinstance(cid, int):
             cover_url = _build_cover_url(cid, None)
     # Categories
-    categories = [s for s in data.get('subjects') or [] if isinstance(s, str)]
+    categories = tuple(s for s in data.get('subjects') or [] if isinstance(s, str))
     tags = _generate_tags(title, categories)
     # Language
     lang = 'fr'
@@ -348,7 +490,7 @@ def get_book_openlibrary(book_id: str) -> Optional[Book]:
     ratings_count = 0
     if 'ratings_count' in data and isinstance(data['ratings_count'], int):
         ratings_count = data['ratings_count']
-    book = Book(
+    book = Book.model_construct(
         id=work_id,
         title=title,
         author=author_str,
@@ -362,5 +504,16 @@ def get_book_openlibrary(book_id: str) -> Optional[Book]:
         ratings_count=ratings_count,
         web_reader_link=None,
     )
-    _work_cache[work_id] = book
-    return book
\ No newline at end of file
+    return book
+
+
+def close() -> None:
+    """Close the shared HTTP client and shut down the thread pools.
+
+    Called when the application shuts down; the module cannot fetch
+    from Open Library afterwards.  Pending page prefetches are cancelled
+    rather than waited for.
+    """
+    _page_pool.shutdown(wait=False, cancel_futures=True)
+    _author_pool.shutdown(wait=False, cancel_futures=True)
+    _client.close()
@@ -11,17 +11,24 @@ from __future__ import annotations
 
 from typing import Optional
 
-from fastapi import APIRouter, HTTPException, Query, Body
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Query, Body, Response
+from starlette.concurrency import run_in_threadpool
 from typing_extensions import Literal  # Py3.8 compatibility
 
+from .openlibrary_service import search_books_openlibrary_pages
 from .schemas import Book, PaginatedBooks
-from .store import search_books_google, get_book_google, BOOKS
+from .store import search_books, books_with_title_prefix, get_book_google, get_books_google, BOOKS
 
 # Additional imports for favourites persistence
+import atexit
+import contextlib
 import json
+import os
+import tempfile
+from functools import lru_cache
 from pathlib import Path
 import threading
-from typing import List, Dict
+from typing import Any, Callable, Iterable, List, Dict, Tuple, Union
 
 # Map of language aliases to support loose matching.
 LANG_ALIASES = {
@@ -31,6 +38,8 @@ LANG_ALIASES = {
 }
 
 
+# Filter values come from a small, repetitive vocabulary.
+@lru_cache(maxsize=4096)
 def _normalize(s: Optional[str]) -> str:
     return (s or "").strip().lower()
 
@@ -51,49 +60,94 @@ def _lang_matches(book_lang: Optional[str], requested: Optional[str]) -> bool:
 
 SortField = Literal["relevance", "title", "author", "year", "rating"]
 
+# Sort key and direction for each sort field; "relevance" keeps the
+# upstream order and therefore has no entry.
+_SORT_KEYS: Dict[str, Tuple[Callable[[Book], Any], bool]] = {
+    "title": (lambda b: (b._title_n, b._author_n), False),
+    "author": (lambda b: (b._author_n, b._title_n), False),
+    "year": (lambda b: b.year or 0, True),
+    "rating": (lambda b: b.rating if b.rating is not None else 0.0, True),
+}
+
+# Number of following pages fetched in the background after /books
+# returns a full page, so that "next page" is served from the cache.
+PREFETCH_PAGES = 2
+
 router = APIRouter(prefix="/api/catalog", tags=["catalog"])
 
+# Book endpoints return pre-serialised JSON.  Returning a ``Response``
+# skips FastAPI's validation of the result against ``response_model``
+# (the books are already ``Book`` instances) and the stdlib ``json``
+# encoding step; each book's JSON is written by pydantic once and then
+# reused (``Book.json_bytes()``).  The ``response_model`` declarations
+# still document the OpenAPI schema.
+
+
+def _json_response(content: Union[bytes, str]) -> Response:
+    return Response(content=content, media_type="application/json")
+
+
+def _books_json(books: Iterable[Book]) -> bytes:
+    """Encode ``books`` as a JSON array from their cached encodings."""
+    return b"[" + b",".join([b.json_bytes() for b in books]) + b"]"
+
 # ---------------------------------------------------------------------------
 # Favourites management
 #
 # Favourites are stored per-user in a simple JSON file on disk.  The
 # file ``app/data/favorites.json`` contains a mapping from user IDs
-# (strings) to lists of book IDs.  To avoid race conditions in a
-# concurrent environment, all read/write operations on this file are
-# synchronised with a threading.Lock.  When the file does not exist or
-# cannot be read, an empty dictionary is returned.  Clients interact
-# with these favourites via the endpoints defined below.
+# (strings) to lists of book IDs.  The file is read once at import into
+# ``_FAVS``, which then serves every read and mutation from memory.
+# Mutations schedule a debounced flush: writes made within
+# ``FAV_FLUSH_DELAY`` seconds of each other are coalesced into a single
+# rewrite of the file, performed on a background timer thread (and at
+# interpreter exit).  The file is replaced atomically, so a reader never
+# sees a partial write.  Only a single writer process is supported: an
+# edit made to the file from outside (e.g. by hand) is picked up on the
+# next access, but only while no local change is waiting to be flushed;
+# otherwise the next flush overwrites it.  When the file does not exist,
+# favourites start empty; when it cannot be parsed, the favourites
+# already in memory are kept.  Clients interact with these favourites
+# via the endpoints defined below.
 
 # Path to the favourites data file
 FAV_FILE = Path(__file__).resolve().parents[2] / "data" / "favorites.json"
-# Lock to synchronise access to the favourites file
-_fav_lock = threading.Lock()
+# Lock to synchronise writes to the favourites file (re-entrant so that a
+# flush can hold it across its snapshot and ``_save_favorites()``)
+_fav_lock = threading.RLock()
+# Seconds to wait after a mutation before rewriting the file
+FAV_FLUSH_DELAY = 1.0
 
-def _load_favorites() -> Dict[str, List[str]]:
+def _load_favorites() -> Optional[Dict[str, List[str]]]:
     """Load the favourites mapping from disk.
 
     Returns
     -------
-    Dict[str, List[str]]
-        A mapping of user IDs to lists of book IDs.  If the file is
-        missing or malformed, an empty dict is returned.
+    Optional[Dict[str, List[str]]]
+        A mapping of user IDs to lists of book IDs; empty if the file is
+        missing.  ``None`` if the file exists but cannot be read or
+        parsed.
     """
     try:
-        if FAV_FILE.exists():
-            with FAV_FILE.open("r", encoding="utf-8") as f:
-                data = json.load(f)
-                if isinstance(data, dict):
-                    return {
-                        str(k): [str(bid) for bid in v] if isinstance(v, list) else []
-                        for k, v in data.items()
-                    }
-    except Exception:
-        pass
-    return {}
+        with FAV_FILE.open("r", encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict):
+        return None
+    return {
+        str(k): [str(bid) for bid in v] if isinstance(v, list) else []
+        for k, v in data.items()
+    }
 
 def _save_favorites(data: Dict[str, List[str]]) -> None:
     """Persist the favourites mapping to disk.
 
+    The mapping is written to a temporary file in the same directory,
+    which then replaces ``FAV_FILE`` atomically.
+
     Parameters
     ----------
     data : Dict[str, List[str]]
@@ -102,16 +156,134 @@ def _save_favorites(data: Dict[str, List[str]]) -> None:
     # Ensure the parent directory exists
     FAV_FILE.parent.mkdir(parents=True, exist_ok=True)
     with _fav_lock:
+        tmp_path = None
         try:
-            with FAV_FILE.open("w", encoding="utf-8") as f:
+            fd, tmp_path = tempfile.mkstemp(
+                dir=FAV_FILE.parent, prefix=FAV_FILE.name, suffix=".tmp"
+            )
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
                 json.dump(data, f, ensure_ascii=False, indent=2)
+            # mkstemp() creates the file as 0600; keep the usual mode
+            os.chmod(tmp_path, _fav_file_mode())
+            os.replace(tmp_path, FAV_FILE)
         except Exception:
             # Best-effort: ignore write errors
-            pass
+            if tmp_path is not None:
+                with contextlib.suppress(OSError):
+                    os.unlink(tmp_path)
+
+
+def _fav_file_mode() -> int:
+    """Return the permission bits of ``FAV_FILE`` (0o644 if missing)."""
+    try:
+        return FAV_FILE.stat().st_mode & 0o777
+    except OSError:
+        return 0o644
+
+
+def _fav_file_stamp() -> Tuple[int, int, int]:
+    """Return ``(inode, mtime_ns, size)`` of ``FAV_FILE`` (zeros if missing).
+
+    Every save replaces the file, so the inode changes even when two
+    writes land in the same mtime tick.
+    """
+    try:
+        st = FAV_FILE.stat()
+    except OSError:
+        return (0, 0, 0)
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+# In-memory favourites: user ID -> book IDs.  The inner dicts are used
+# as insertion-ordered sets (values are always ``None``) so membership
+# checks are O(1) while the order shown to the user is preserved.
+_fav_stamp = _fav_file_stamp()
+_FAVS: Dict[str, Dict[str, None]] = {
+    uid: dict.fromkeys(ids) for uid, ids in (_load_favorites() or {}).items()
+}
+# Guards ``_FAVS``, ``_fav_stamp``, ``_flush_timer`` and ``_flushing``;
+# never held during file I/O.
+_favs_state_lock = threading.Lock()
+_flush_timer: Optional[threading.Timer] = None
+# True while a flush is writing the file and has not yet recorded its stamp
+_flushing = False
+
+
+def _refresh_favorites() -> None:
+    """Reload ``_FAVS`` if ``FAV_FILE`` was modified by someone else.
+
+    Only a ``stat()`` is performed when the file is unchanged; it is
+    parsed again only when its stamp differs from the one we last read
+    or wrote.  Nothing is reloaded while local changes are pending or
+    being written, nor when the file cannot be parsed.
+    """
+    global _fav_stamp
+    stamp = _fav_file_stamp()
+    with _favs_state_lock:
+        if stamp == _fav_stamp or _flush_timer is not None or _flushing:
+            return
+    data = _load_favorites()
+    with _favs_state_lock:
+        if _flush_timer is not None or _flushing:
+            return
+        if data is not None:
+            _FAVS.clear()
+            _FAVS.update({uid: dict.fromkeys(ids) for uid, ids in data.items()})
+        # An unreadable file is not parsed again until it changes.
+        _fav_stamp = stamp
+
+
+def _get_favorite_ids(user_id: str) -> List[str]:
+    """Return a snapshot of the favourite book IDs of ``user_id``."""
+    _refresh_favorites()
+    with _favs_state_lock:
+        return list(_FAVS.get(user_id, ()))
+
+
+def _flush_favorites() -> None:
+    """Write the current in-memory favourites to ``FAV_FILE``."""
+    global _flush_timer, _fav_stamp, _flushing
+    # Holding the file lock throughout keeps concurrent flushes writing
+    # their snapshots in the order they were taken.
+    with _fav_lock:
+        with _favs_state_lock:
+            # Changes made from now on schedule a new flush.
+            _flush_timer = None
+            _flushing = True
+            snapshot = {uid: list(ids) for uid, ids in _FAVS.items()}
+        try:
+            _save_favorites(snapshot)
+        finally:
+            with _favs_state_lock:
+                _fav_stamp = _fav_file_stamp()
+                _flushing = False
+
+
+def _schedule_flush() -> None:
+    """Schedule a flush unless one is already pending.
+
+    Must be called with ``_favs_state_lock`` held.
+    """
+    global _flush_timer
+    if _flush_timer is None:
+        _flush_timer = threading.Timer(FAV_FLUSH_DELAY, _flush_favorites)
+        _flush_timer.daemon = True
+        _flush_timer.start()
+
+
+@atexit.register
+def _flush_pending_favorites() -> None:
+    """Write favourites still waiting on the debounce timer at exit."""
+    with _favs_state_lock:
+        timer = _flush_timer
+    if timer is not None:
+        timer.cancel()
+        _flush_favorites()
 
 
 @router.get("/books", response_model=PaginatedBooks)
 def list_books(
+    background_tasks: BackgroundTasks,
     q: Optional[str] = Query(default=None, description="Recherche texte (titre/auteur)"),
     category: Optional[str] = Query(default=None, description="Filtrer par catégorie"),
     tag: Optional[str] = Query(default=None, description="Filtrer par tag"),
@@ -119,12 +291,13 @@ def list_books(
     sort: SortField = Query(default="relevance", description="Tri"),
     page: int = Query(default=1, ge=1, description="Page courante (1-indexée)"),
     page_size: int = Query(default=12, ge=4, le=200, description="Taille de page"),
-) -> PaginatedBooks:
+    prefix: bool = Query(default=False, description="Autocomplétion : titres du catalogue local commençant par q"),
+) -> Response:
     """
     Returns a paginated list of books.
 
     Important:
-    - search_books_google() gère déjà Google + fallback local (si tu as appliqué le patch fallback).
+    - search_books() gère déjà Google + fallback local (si tu as appliqué le patch fallback).
     - On applique ensuite nos filtres locaux + tri.
     - Puis on recalcule total/total_pages après filtres.
     """
@@ -132,60 +305,81 @@ def list_books(
     ncat = _normalize(category)
     ntag = _normalize(tag)
 
-    # 1) Fetch (Google OR fallback local)
-    books, _ = search_books_google(
-        q=q,
-        category=category,
-        tag=tag,
-        language=language,
-        sort=sort,
-        page=page,
-        page_size=page_size,
-    )
-
-    # 2) Local filters (category/tag/lang) to be safe
-    if ncat:
-        books = [b for b in books if any(_normalize(c) == ncat for c in (b.categories or []))]
-    if ntag:
-        books = [b for b in books if any(_normalize(t) == ntag for t in (b.tags or []))]
-    if language:
-        books = [b for b in books if _lang_matches(getattr(b, "language", None), language)]
-
-    # 3) Local sorting
-    if sort == "title":
-        books.sort(key=lambda b: (_normalize(b.title), _normalize(b.author)))
-    elif sort == "author":
-        books.sort(key=lambda b: (_normalize(b.author), _normalize(b.title)))
-    elif sort == "year":
-        books.sort(key=lambda b: (b.year or 0), reverse=True)
-    elif sort == "rating":
-        books.sort(key=lambda b: (b.rating if b.rating is not None else 0.0), reverse=True)
+    if prefix and _normalize(q):
+        # 1) Typeahead: Open Library does not match partial words, so
+        #    title prefixes are looked up in the local title index only.
+        #    All matches are returned and paginated below.
+        books = books_with_title_prefix(q)
+        fetched, from_openlibrary = len(books), False
+    else:
+        # 1) Fetch (Google OR fallback local)
+        books, fetched, from_openlibrary = search_books(
+            q=q,
+            category=category,
+            tag=tag,
+            language=language,
+            sort=sort,
+            page=page,
+            page_size=page_size,
+        )
+
+    # A full page from Open Library suggests more results: warm the cache
+    # for the next pages once the response has been sent.  (For the local
+    # fallback, ``fetched`` counts every local match, and Open Library
+    # has just failed or come back empty.)
+    if from_openlibrary and fetched >= page_size:
+        background_tasks.add_task(
+            search_books_openlibrary_pages,
+            range(page + 1, page + 1 + PREFETCH_PAGES),
+            q=q,
+            category=category,
+            tag=tag,
+            language=language,
+            sort=sort,
+            page_size=page_size,
+        )
+
+    # 2) Local filters (category/tag/lang) to be safe, fused into a single
+    #    pass so only one filtered list is built
+    if ncat or ntag or language:
+        books = [
+            b for b in books
+            if (not ncat or ncat in b._cats_n)
+            and (not ntag or ntag in b._tags_n)
+            and (not language or _lang_matches(b._lang_n, language))
+        ]
+
+    # 3) Local sorting.  ``sorted`` rather than ``list.sort``: ``books`` may be
+    #    the very list held by the search cache, whose order must not change.
+    sort_spec = _SORT_KEYS.get(sort)
+    if sort_spec is not None:
+        key, reverse = sort_spec
+        books = sorted(books, key=key, reverse=reverse)
 
     # 4) Pagination metadata AFTER filters
     total = len(books)
-    total_pages = max(1, (total + page_size - 1) // page_size) if total > 0 else 1
+    total_pages = -(-total // page_size) or 1
     page = min(max(1, page), total_pages)
 
-    # 5) Slice items for the requested page (important if search_books_google fallback returns more)
+    # 5) Slice items for the requested page (important if search_books fallback returns more)
     start = (page - 1) * page_size
     end = start + page_size
     page_items = books[start:end]
 
-    return PaginatedBooks(
-        page=page,
-        page_size=page_size,
-        total=total,
-        total_pages=total_pages,
-        items=page_items,
+    # The books are already validated and serialised, so the page is
+    # assembled from their cached JSON (same layout as ``PaginatedBooks``)
+    return _json_response(
+        b'{"page":%d,"page_size":%d,"total":%d,"total_pages":%d,"items":%s}'
+        % (page, page_size, total, total_pages, _books_json(page_items))
     )
 
 
 @router.get("/books/{book_id}", response_model=Book)
-def get_book(book_id: str) -> Book:
+def get_book(book_id: str) -> Response:
     book = get_book_google(book_id)
     if book is None:
         raise HTTPException(status_code=404, detail="Book not found")
-    return book
+    return _json_response(book.json_bytes())
 
 
 @router.get("/debug/local")
@@ -207,16 +401,21 @@ def debug_local():
 # Favourite endpoints
 #
 # These endpoints allow clients to manage per-user favourites.  They
-# delegate to ``_load_favorites()`` and ``_save_favorites()`` for
-# persistence.  A favourite is simply a book ID stored under a user
-# identifier.  The front-end should provide a unique ``user_id``
-# derived from the logged-in account (e.g. email or user ID) when
-# calling these endpoints.
+# read and update ``_FAVS`` in memory; persistence is handled by the
+# debounced ``_flush_favorites()``.  A favourite is simply a book ID
+# stored under a user identifier.  The front-end should provide a
+# unique ``user_id`` derived from the logged-in account (e.g. email or
+# user ID) when calling these endpoints.
 
 @router.get("/favorites/{user_id}", response_model=List[Book])
-def list_favorites(user_id: str) -> List[Book]:
+async def list_favorites(user_id: str) -> Response:
     """Return the list of favourite books for a given user.
 
+    Each favourite may require a round-trip to Open Library, so the
+    lookups are batched through ``get_books_google()``, which runs them
+    concurrently rather than one after the other.  The order of the
+    stored IDs is preserved.
+
     Parameters
     ----------
     user_id : str
@@ -225,20 +424,12 @@ def list_favorites(user_id: str) -> List[Book]:
 
     Returns
     -------
-    List[Book]
-        A list of books corresponding to the stored favourite IDs.
+    Response
+        JSON list of books corresponding to the stored favourite IDs.
     """
-    data = _load_favorites()
-    ids = data.get(str(user_id), [])
-    books: List[Book] = []
-    for bid in ids:
-        try:
-            b = get_book_google(bid)
-        except Exception:
-            b = None
-        if b is not None:
-            books.append(b)
-    return books
+    ids = _get_favorite_ids(str(user_id))
+    results = await run_in_threadpool(get_books_google, ids)
+    return _json_response(_books_json(b for b in results if b is not None))
 
 
 @router.post("/favorites/{user_id}")
@@ -252,14 +443,14 @@ def add_favorite(user_id: str, book_id: str = Body(..., embed=True)):
     book_id : str
         The identifier of the book to add.
     """
-    data = _load_favorites()
+    _refresh_favorites()
     uid = str(user_id)
-    ids = data.get(uid, [])
     bid = str(book_id)
-    if bid not in ids:
-        ids.append(bid)
-    data[uid] = ids
-    _save_favorites(data)
+    with _favs_state_lock:
+        ids = _FAVS.setdefault(uid, {})
+        if bid not in ids:
+            ids[bid] = None
+            _schedule_flush()
     return {"status": "ok"}
 
 
@@ -274,14 +465,14 @@ def remove_favorite(user_id: str, book_id: str):
     book_id : str
         The identifier of the book to remove.
     """
-    data = _load_favorites()
+    _refresh_favorites()
     uid = str(user_id)
     bid = str(book_id)
-    ids = data.get(uid, [])
-    if bid in ids:
-        ids.remove(bid)
-        data[uid] = ids
-    _save_favorites(data)
+    with _favs_state_lock:
+        ids = _FAVS.get(uid)
+        if ids is not None and bid in ids:
+            del ids[bid]
+            _schedule_flush()
     return {"status": "ok"}
 
 
@@ -294,7 +485,8 @@ def clear_favorites(user_id: str):
     user_id : str
         The user identifier.
     """
-    data = _load_favorites()
-    data[str(user_id)] = []
-    _save_favorites(data)
+    _refresh_favorites()
+    with _favs_state_lock:
+        _FAVS[str(user_id)] = {}
+        _schedule_flush()
     return {"status": "ok"}
@@ -8,9 +8,14 @@ model bundles together a list of books with pagination metadata so
 that clients know how many pages of results are available.
 """
 
-from typing import List, Optional
+from typing import Any, FrozenSet, List, Optional, Tuple
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, PrivateAttr
+
+
+def _normalize(s: Optional[str]) -> str:
+    """Lowercase and strip a string for case-insensitive comparison."""
+    return (s or "").strip().lower()
 
 
 class Book(BaseModel):
@@ -19,21 +24,26 @@ class Book(BaseModel):
     This model intentionally keeps a narrow set of fields so that
     clients only receive the information necessary to render a
     catalogue view. Fields such as ``author``, ``short_description``
-    and ``cover_url`` are plain strings. Lists such as
-    ``categories`` and ``tags`` can be empty. The ``rating`` field
-    is optional and represents the average rating from the data
-    provider (e.g., Google Books). If no rating is available, it
-    will be ``None``. ``ratings_count`` reflects the number of
-    reviews and defaults to 0.
+    and ``cover_url`` are plain strings. ``categories`` and ``tags``
+    are tuples and can be empty. The ``rating`` field is optional
+    and represents the average rating from the data provider (e.g.,
+    Google Books). If no rating is available, it will be ``None``.
+    ``ratings_count`` reflects the number of reviews and defaults
+    to 0. Books are immutable once created.
     """
 
+    # Books are shared between caches and requests, so they are frozen;
+    # the tuple defaults are shared too instead of allocating two lists
+    # per book.
+    model_config = ConfigDict(frozen=True)
+
     id: str
     title: str
     author: str
     short_description: str = ""
     cover_url: str = ""
-    categories: List[str] = Field(default_factory=list)
-    tags: List[str] = Field(default_factory=list)
+    categories: Tuple[str, ...] = ()
+    tags: Tuple[str, ...] = ()
     language: str = "fr"
     year: Optional[int] = None
     # Rating is optional; use None when unavailable so the front‑end
@@ -49,6 +59,45 @@ class Book(BaseModel):
     # provider. If no reader link is available, the value will be ``None``.
     web_reader_link: Optional[str] = None
 
+    # Normalised (stripped, lowercased) copies of the fields used by the
+    # catalogue filters and sort keys.  They are computed once when the
+    # book is created so that requests do not re-normalise every field
+    # of every book.  Private attributes are not part of the API output.
+    _title_n: str = PrivateAttr(default="")
+    _author_n: str = PrivateAttr(default="")
+    _lang_n: str = PrivateAttr(default="")
+    _cats_n: FrozenSet[str] = PrivateAttr(default=frozenset())
+    _tags_n: FrozenSet[str] = PrivateAttr(default=frozenset())
+    # Title, author, description, categories and tags joined into one
+    # normalised string for free-text search.
+    _blob_n: str = PrivateAttr(default="")
+    # JSON encoding of the book, filled in by ``json_bytes()``.
+    _json: Optional[bytes] = PrivateAttr(default=None)
+
+    def model_post_init(self, __context: Any) -> None:
+        self._title_n = _normalize(self.title)
+        self._author_n = _normalize(self.author)
+        self._lang_n = _normalize(self.language)
+        self._cats_n = frozenset(_normalize(c) for c in self.categories)
+        self._tags_n = frozenset(_normalize(t) for t in self.tags)
+        self._blob_n = " ".join([
+            self._title_n,
+            self._author_n,
+            _normalize(self.short_description),
+            " ".join([_normalize(c) for c in self.categories]),
+            " ".join([_normalize(t) for t in self.tags]),
+        ])
+
+    def json_bytes(self) -> bytes:
+        """Return the JSON encoding of this book.
+
+        Books are frozen, so the encoding is computed on first use and
+        then reused by every response that includes the book.
+        """
+        if self._json is None:
+            self._json = self.model_dump_json().encode("utf-8")
+        return self._json
+
 
 class PaginatedBooks(BaseModel):
     """A wrapper for paginated results returned from ``/books`` endpoint."""
@@ -10,21 +10,32 @@ PostgreSQL, MongoDB, etc.). Each entry is converted into a
 
 from __future__ import annotations
 
+import bisect
 import json
-import os
-import re
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from pydantic import TypeAdapter, ValidationError
 
 # We no longer depend on the Google Books API, so requests is unused.
 # Instead, use the Open Library service defined in openlibrary_service.
 from .openlibrary_service import search_books_openlibrary, get_book_openlibrary
+from .openlibrary_service import get_cached_book_openlibrary
+from .openlibrary_service import close as close_openlibrary
 
+from ..cache import TTLCache
 from .schemas import Book
 
 # Optional local sample data (unused by Google API but kept for fallback/testing)
 DATA_FILE = Path(__file__).resolve().parents[1] / "data" / "sample_books.json"
 
+logger = logging.getLogger(__name__)
+
+_BOOK_LIST_ADAPTER = TypeAdapter(List[Book])
+
 
 def _load_sample_books() -> List[Book]:
     """Load local sample books for fallback or testing.
@@ -33,12 +44,19 @@ def _load_sample_books() -> List[Book]:
     -------
     List[Book]
         A list of Book instances loaded from ``sample_books.json``.
+        Entries that cannot be converted or validated are skipped (and
+        logged); a missing or unparsable file gives an empty list.
     """
-    books: List[Book] = []
     try:
-        with DATA_FILE.open("r", encoding="utf-8") as f:
-            raw = json.load(f)
-        for entry in raw:
+        raw = json.loads(DATA_FILE.read_bytes())
+    except Exception:
+        # Ignore errors if sample file is missing or malformed
+        return []
+    if not isinstance(raw, list):
+        return []
+    entries = []
+    for index, entry in enumerate(raw):
+        try:
             authors = entry.get("authors") or []
             author_str = ", ".join(authors) if isinstance(authors, list) else str(authors)
             book_id = entry.get("work_id") or entry.get("id") or ""
@@ -54,31 +72,70 @@ def _load_sample_books() -> List[Book]:
                 rating = float(rating_val) if rating_val not in (None, "") else None
             except Exception:
                 rating = None
-            books.append(
-                Book(
-                    id=str(book_id),
-                    title=str(entry.get("title") or ""),
-                    author=author_str or "",
-                    short_description=str(entry.get("description") or ""),
-                    cover_url=entry.get("cover_url") or "",
-                    categories=categories,
-                    tags=tags,
-                    language=entry.get("language") or "fr",
-                    year=entry.get("year"),
-                    rating=rating,
-                    ratings_count=int(entry.get("ratings_count") or 0),
-                )
+            entries.append(
+                {
+                    "id": str(book_id),
+                    "title": str(entry.get("title") or ""),
+                    "author": author_str or "",
+                    "short_description": str(entry.get("description") or ""),
+                    "cover_url": entry.get("cover_url") or "",
+                    "categories": categories,
+                    "tags": tags,
+                    "language": entry.get("language") or "fr",
+                    "year": entry.get("year"),
+                    "rating": rating,
+                    "ratings_count": int(entry.get("ratings_count") or 0),
+                }
             )
-    except Exception:
-        # Ignore errors if sample file is missing or malformed
-        pass
-    return books
+        except Exception as exc:
+            logger.warning("Skipping malformed sample book #%d: %s", index, exc)
+    # Validate the whole list in one call into pydantic's core
+    # rather than constructing each ``Book`` separately.
+    try:
+        return _BOOK_LIST_ADAPTER.validate_python(entries)
+    except ValidationError as exc:
+        # Drop only the invalid entries (the first location of each
+        # error is the list index) and validate the others again.
+        invalid = {err["loc"][0] for err in exc.errors() if err["loc"]}
+        for i in sorted(invalid):
+            logger.warning("Skipping invalid sample book %r", entries[i].get("id"))
+        return _BOOK_LIST_ADAPTER.validate_python(
+            [e for i, e in enumerate(entries) if i not in invalid]
+        )
 
 
 # In-memory collection of books used for local fallback (not used for Google API)
 BOOKS: List[Book] = _load_sample_books()
 
-
+# ``BOOKS`` does not change after load, so each sort order is computed once
+# here instead of on every request.  'relevance' is the natural order of
+# ``BOOKS`` itself.  Filtering one of these lists keeps it sorted.  These
+# lists must never be mutated; rebuild them if ``BOOKS`` ever gains a
+# write path.
+_BOOKS_BY_SORT: Dict[str, List[Book]] = {
+    "title": sorted(BOOKS, key=lambda b: (b._title_n, b._author_n)),
+    "author": sorted(BOOKS, key=lambda b: (b._author_n, b._title_n)),
+    "year": sorted(BOOKS, key=lambda b: (b.year or 0), reverse=True),
+    "rating": sorted(BOOKS, key=lambda b: (b.rating if b.rating is not None else 0.0), reverse=True),
+}
+# Normalised titles in title order, for binary search on prefixes.
+_TITLES_N: List[str] = [b._title_n for b in _BOOKS_BY_SORT["title"]]
+
+# Results of ``search_books()`` and ``get_book_google()`` served by the
+# local fallback.  Open Library results are cached by
+# ``openlibrary_service`` and not kept a second time here.  Keys use
+# normalised parameters so that e.g. "Dune" and " dune" share an entry.
+# The sort order is part of the search key: the local fallback sorts
+# before it paginates, so each order has different pages.
+_SEARCH_CACHE = TTLCache(maxsize=2048, ttl=300)
+_BOOK_CACHE = TTLCache(maxsize=8192, ttl=3600)
+
+# Pool for ``get_books_google()``.  It is separate from the Open Library
+# pools because each task may itself resolve authors on ``_author_pool``.
+_batch_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="catalog-batch")
+
+
+@lru_cache(maxsize=4096)
 def _norm(s: Optional[str]) -> str:
     """Normalize a string for case-insensitive comparison.
 
@@ -96,6 +153,21 @@ def _norm(s: Optional[str]) -> str:
     return (s or "").strip().lower()
 
 
+def books_with_title_prefix(prefix: Optional[str]) -> List[Book]:
+    """Return the local books whose title starts with ``prefix``.
+
+    Matching is case-insensitive, for typeahead.  Two bisections on
+    ``_TITLES_N`` locate the matching run in O(log N), and the result is
+    in title order.  Open Library cannot match partial words, so only
+    the local collection is searched.
+    """
+    prefix = _norm(prefix)
+    titles = _BOOKS_BY_SORT["title"]
+    i = bisect.bisect_left(_TITLES_N, prefix)
+    j = bisect.bisect_left(_TITLES_N, prefix + "\U0010ffff", i)
+    return titles[i:j]
+
+
 def _search_books_local(
     q: Optional[str] = None,
     category: Optional[str] = None,
@@ -144,52 +216,13 @@ def _search_books_local(
         A list of ``Book`` objects for the requested page and the
         total number of items matching the query (before pagination).
     """
-    # Start with all books
-    items = BOOKS.copy()
+    # Start with all books, already in the requested order
+    items = _BOOKS_BY_SORT.get(sort, BOOKS)
     nq = _norm(q)
     ncat = _norm(category)
     ntag = _norm(tag)
     nlang = _norm(language)
 
-    # Apply free‑text search
-    if nq:
-        def _matches(book: Book) -> bool:
-            # Concatenate searchable fields into a single lowercase string
-            blob_parts = [
-                _norm(book.title),
-                _norm(book.author),
-                _norm(book.short_description),
-                " ".join([_norm(c) for c in (book.categories or [])]),
-                " ".join([_norm(t) for t in (book.tags or [])]),
-            ]
-            blob = " ".join(blob_parts)
-            return nq in blob
-        items = [b for b in items if _matches(b)]
-
-    # Apply category filter
-    if ncat:
-        items = [b for b in items if any(_norm(c) == ncat for c in (b.categories or []))]
-
-    # Apply tag filter
-    if ntag:
-        items = [b for b in items if any(_norm(t) == ntag for t in (b.tags or []))]
-
-    # Apply language filter
-    if nlang:
-        items = [b for b in items if _norm(b.language) == nlang]
-
-    # Sorting
-    if sort == "title":
-        items.sort(key=lambda b: (_norm(b.title), _norm(b.author)))
-    elif sort == "author":
-        items.sort(key=lambda b: (_norm(b.author), _norm(b.title)))
-    elif sort == "year":
-        items.sort(key=lambda b: (b.year or 0), reverse=True)
-    elif sort == "rating":
-        items.sort(key=lambda b: (b.rating if b.rating is not None else 0.0), reverse=True)
-    # 'relevance' uses natural order (no additional sort)
-
-    total = len(items)
     # Pagination: clamp page_size and page
     try:
         ps = max(1, int(page_size))
@@ -201,7 +234,30 @@ def _search_books_local(
         p = 1
     start = (p - 1) * ps
     end = start + ps
-    return items[start:end], total
+
+    # Without filters every book matches: slice the (presorted) list.
+    if not (nq or ncat or ntag or nlang):
+        return items[start:end], len(items)
+
+    # Apply all filters in a single pass.  The language/category/tag
+    # checks are O(1) and usually discard most books, so they run before
+    # the free‑text search on the pre-joined, normalised ``_blob_n``.
+    # Matches are counted as they stream past and only those on the
+    # requested page are kept, so no intermediate list is built.
+    matches = (
+        b for b in items
+        if (not nlang or b._lang_n == nlang)
+        and (not ncat or ncat in b._cats_n)
+        and (not ntag or ntag in b._tags_n)
+        and (not nq or nq in b._blob_n)
+    )
+    page_items: List[Book] = []
+    total = 0
+    for b in matches:
+        if start <= total < end:
+            page_items.append(b)
+        total += 1
+    return page_items, total
 
 
 def _parse_year(published: str) -> Optional[int]:
@@ -220,10 +276,65 @@ def _parse_year(published: str) -> Optional[int]:
     Optional[int]
         The extracted year or ``None`` if parsing fails.
     """
-    if not published:
-        return None
-    m = re.match(r"(\d{4})", published)
-    return int(m.group(1)) if m else None
+    head = published[:4] if published else ""
+    # ``isdecimal`` accepts exactly the digits ``\d`` matched before
+    return int(head) if len(head) == 4 and head.isdecimal() else None
+
+
+def search_books(
+    q: Optional[str] = None,
+    category: Optional[str] = None,
+    tag: Optional[str] = None,
+    language: Optional[str] = None,
+    sort: str = "relevance",
+    page: int = 1,
+    page_size: int = 12,
+) -> Tuple[List[Book], int, bool]:
+    """Search books like ``search_books_google()``, reporting the source.
+
+    Returns
+    -------
+    Tuple[List[Book], int, bool]
+        The books and total of ``search_books_google()``, and whether
+        they came from Open Library (``False`` for the local fallback).
+    """
+    try:
+        # Delegate to Open Library search (cached there). This returns a
+        # list of Book objects or an empty list.
+        books = search_books_openlibrary(
+            q=q,
+            category=category,
+            tag=tag,
+            language=language,
+            sort=sort,
+            page=page,
+            page_size=page_size,
+        )
+    except Exception:
+        books = []
+    if books:
+        # Compute a simple total count. Open Library returns a limited
+        # number of documents per page; we cannot know the global total
+        # without making additional requests, so we use the length of
+        # returned results for pagination purposes. The router performs
+        # additional filtering and sorting.
+        return books, len(books), True
+    # When no results are found, fallback to the local collection.
+    key = (_norm(q), _norm(category), _norm(tag), _norm(language), sort, page, page_size)
+    cached = _SEARCH_CACHE.get(key)
+    if cached is None:
+        cached = _search_books_local(
+            q=q,
+            category=category,
+            tag=tag,
+            language=language,
+            sort=sort,
+            page=page,
+            page_size=page_size,
+        )
+        _SEARCH_CACHE.set(key, cached)
+    local_books, total_local = cached
+    return local_books, total_local, False
 
 
 def search_books_google(
@@ -243,7 +354,8 @@ def search_books_google(
     ``search_books_openlibrary()`` which performs an anonymous
     search against Open Library. If Open Library returns no results
     or is unreachable, the function falls back to the local sample
-    dataset via ``_search_books_local()``.
+    dataset via ``_search_books_local()``.  See ``search_books()`` to
+    also know which of the two answered.
 
     Parameters
     ----------
@@ -269,39 +381,16 @@ def search_books_google(
         the total number of items returned by Open Library (or the
         local fallback).
     """
-    try:
-        # Delegate to Open Library search. This returns a list of Book
-        # objects or an empty list.
-        books = search_books_openlibrary(
-            q=q,
-            category=category,
-            tag=tag,
-            language=language,
-            sort=sort,
-            page=page,
-            page_size=page_size,
-        )
-    except Exception:
-        books = []
-    if not books:
-        # When no results are found, fallback to the local collection.
-        local_books, total_local = _search_books_local(
-            q=q,
-            category=category,
-            tag=tag,
-            language=language,
-            sort=sort,
-            page=page,
-            page_size=page_size,
-        )
-        return local_books, total_local
-    # Compute a simple total count. Open Library returns a limited
-    # number of documents per page; we cannot know the global total
-    # without making additional requests, so we use the length of
-    # returned results for pagination purposes. The router performs
-    # additional filtering and sorting.
-    total_items = len(books)
-    return books, total_items
+    books, total, _ = search_books(
+        q=q,
+        category=category,
+        tag=tag,
+        language=language,
+        sort=sort,
+        page=page,
+        page_size=page_size,
+    )
+    return books, total
 
 
 def get_book_google(book_id: str) -> Optional[Book]:
@@ -325,14 +414,54 @@ def get_book_google(book_id: str) -> Optional[Book]:
     Optional[Book]
         A Book instance if found; otherwise ``None``.
     """
+    cached = _BOOK_CACHE.get(book_id)
+    if cached is not None:
+        return cached
     try:
         book = get_book_openlibrary(book_id)
-        if book is not None:
-            return book
     except Exception:
         book = None
-    # Fallback to local dataset
-    for b in BOOKS:
-        if str(b.id) == str(book_id):
-            return b
-    return None
\ No newline at end of file
+    if book is None:
+        # Fallback to local dataset
+        book = next((b for b in BOOKS if str(b.id) == str(book_id)), None)
+        if book is not None:
+            _BOOK_CACHE.set(book_id, book)
+    return book
+
+
+def get_books_google(book_ids: Iterable[str]) -> List[Optional[Book]]:
+    """Fetch several books concurrently, see ``get_book_google()``.
+
+    Cached books are returned directly; the remaining IDs are fetched in
+    parallel on a small bounded pool so that a long list (e.g. a user's
+    favourites) does not occupy one server thread per book.
+
+    Parameters
+    ----------
+    book_ids : Iterable[str]
+        The Open Library work IDs to fetch.
+
+    Returns
+    -------
+    List[Optional[Book]]
+        One entry per requested ID, in the same order; ``None`` for IDs
+        that could not be found.
+    """
+    ids = list(book_ids)
+    books: List[Optional[Book]] = [
+        _BOOK_CACHE.get(bid) or get_cached_book_openlibrary(bid) for bid in ids
+    ]
+    missing = [i for i, book in enumerate(books) if book is None]
+    if len(missing) == 1:
+        books[missing[0]] = get_book_google(ids[missing[0]])
+    elif missing:
+        fetched = _batch_pool.map(get_book_google, [ids[i] for i in missing])
+        for i, book in zip(missing, fetched):
+            books[i] = book
+    return books
+
+
+def close() -> None:
+    """Release the catalogue's thread pools and Open Library client."""
+    _batch_pool.shutdown(wait=False, cancel_futures=True)
+    close_openlibrary()
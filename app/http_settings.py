@@ -0,0 +1,40 @@
+"""
+HTTP client settings shared by the chatbot and the catalogue.
+
+Both talk to Open Library through httpx: the chatbot with an
+``httpx.AsyncClient`` (``app/main.py``), and the catalogue, whose routes
+run in FastAPI's threadpool, with a thread-safe ``httpx.Client``
+(``app/catalog/openlibrary_service.py``).  ``client_options()`` returns
+the keyword arguments both clients are built with, so they identify
+themselves and behave the same way.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict
+
+import httpx
+
+# HTTP/2 multiplexes concurrent requests (e.g. several authors) over one
+# connection.  It needs the ``h2`` package (``httpx[http2]``); without it
+# the clients use HTTP/1.1 keep-alive connections.
+try:
+    import h2  # noqa: F401
+    HTTP2 = True
+except ImportError:  # pragma: no cover - depends on the environment
+    HTTP2 = False
+
+# Seconds allowed for each phase of a request (connect, read, ...).
+HTTP_TIMEOUT = 10
+HTTP_LIMITS = httpx.Limits(max_keepalive_connections=50, max_connections=100)
+HTTP_HEADERS = {"User-Agent": "book-chatbot/1.0", "Accept": "application/json"}
+
+
+def client_options() -> Dict[str, Any]:
+    """Return the keyword arguments for an Open Library httpx client."""
+    return {
+        "http2": HTTP2,
+        "timeout": HTTP_TIMEOUT,
+        "limits": HTTP_LIMITS,
+        "headers": HTTP_HEADERS,
+    }
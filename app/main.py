@@ -23,25 +23,66 @@ the root URL in a browser to use the chat interface.
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
+import re
 import time
-import uuid
+from contextlib import asynccontextmanager
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, List, NamedTuple, Optional, Set
 
-import requests
-from fastapi import FastAPI, HTTPException, Request
+import httpx
+from fastapi import Depends, FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
+from .cache import TTLCache
+from .http_settings import client_options
+from .sessions import create_chat_store
+
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
-app = FastAPI(title="Book Chatbot API")
+# orjson, when installed, serialises responses much faster than the stdlib
+# encoder; this matters for /chat and /history, whose message lists grow
+# with every turn.  It is an optional dependency.
+try:
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse as DefaultResponse
+except ImportError:  # pragma: no cover - depends on the environment
+    DefaultResponse = JSONResponse
+
+
+@asynccontextmanager
+async def _lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Manage the resources shared by the endpoints.
+
+    On startup the Open Library client is opened and the idle-session
+    sweeper started; on shutdown the sweeper is cancelled, and the
+    client, the chat store and the catalogue's client and thread pools
+    are closed.
+    """
+    global _http_client
+    get_http_client()
+    sweeper = asyncio.create_task(_sweep_idle_sessions())
+    try:
+        yield
+    finally:
+        sweeper.cancel()
+        if _http_client is not None:
+            await _http_client.aclose()
+            _http_client = None
+        await CHAT_STORE.close()
+        if _close_catalog is not None:
+            _close_catalog()
+
+
+app = FastAPI(title="Book Chatbot API", default_response_class=DefaultResponse, lifespan=_lifespan)
 
 # Enable CORS so that the front-end can call the API from the same origin
 # NOTE: for token-based sessions (WordPress/JS), allow_credentials can be False.
@@ -62,10 +103,12 @@ app.add_middleware(
 # catalogue endpoints coexist alongside the chatbot endpoints. By wrapping
 # the import in a try/except, we ensure that the chatbot still functions
 # even if the catalogue package is missing or fails to import.
+_close_catalog: Optional[Callable[[], None]] = None
 try:
-    from .catalog import catalog_router  # type: ignore
+    from .catalog import catalog_router, close_catalog  # type: ignore
 
     app.include_router(catalog_router)
+    _close_catalog = close_catalog
 except Exception as e:  # pragma: no cover - do not fail on import
     logger.warning("Catalogue API could not be loaded: %s", e)
 
@@ -76,15 +119,120 @@ except Exception as e:  # pragma: no cover - do not fail on import
 BASE_DIR = Path(__file__).resolve().parent
 DATA_FILE = BASE_DIR / "data" / "sample_books.json"
 
+
+def _load_sample_books() -> List[Dict]:
+    """Read the local sample dataset, or return an empty list on error."""
+    try:
+        with DATA_FILE.open("r", encoding="utf-8") as f:
+            books = json.load(f)
+        return [b for b in books if isinstance(b, dict)]
+    except Exception as exc:
+        logger.error("Failed to read sample_books.json: %s", exc)
+        return []
+
+
+# The sample dataset is read once at import; the fallbacks below only look
+# it up.  The first record wins when a work ID appears more than once.
+_SAMPLE_BOOKS: List[Dict] = _load_sample_books()
+_SAMPLE_BY_WORK_ID: Dict[str, Dict] = {b.get("work_id"): b for b in reversed(_SAMPLE_BOOKS)}
+# Lowercased titles and authors parallel to ``_SAMPLE_BOOKS``, for the
+# ``/search`` fallback.
+_SAMPLE_TITLES_LOWER: List[str] = [(b.get("title") or "").lower() for b in _SAMPLE_BOOKS]
+_SAMPLE_AUTHORS_LOWER: List[str] = [(b.get("author") or "").lower() for b in _SAMPLE_BOOKS]
+
 # Mount static assets and templates
 app.mount("/static", StaticFiles(directory=str(BASE_DIR / "static")), name="static")
 templates = Jinja2Templates(directory=str(BASE_DIR / "templates"))
 
+# Shared asynchronous HTTP client for Open Library.  The endpoints below
+# are ``async`` and await their upstream calls, so slow Open Library
+# responses no longer hold a threadpool worker each; the client's
+# connection pool is reused across requests, so the TCP/TLS handshake
+# is paid once per connection rather than per call.  It is opened and
+# closed by ``_lifespan``.
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared Open Library client, creating it if needed."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(**client_options())
+    return _http_client
+
+
+# Open Library responses, kept so that follow-up questions about the same
+# book (and repeated searches) skip the network.  Works and editions change
+# rarely and author names practically never.
+WORK_CACHE = TTLCache(maxsize=10_000, ttl=3600)
+AUTHOR_CACHE = TTLCache(maxsize=50_000, ttl=86400)
+EDITIONS_CACHE = TTLCache(maxsize=10_000, ttl=3600)
+SEARCH_CACHE = TTLCache(maxsize=2048, ttl=600)
+
+# Max-age sent to browsers and proxies for ``/search`` and ``/book``.
+CACHE_CONTROL = "public, max-age=600"
+
+# Upstream requests currently in flight, by URL and query parameters.
+# Concurrent callers asking for the same resource await the same task
+# instead of each sending their own request.
+_INFLIGHT: Dict[Hashable, "asyncio.Future[Any]"] = {}
+
+
+async def _get_json_cached(
+    cache: TTLCache, key: Hashable, url: str, params: Optional[Dict[str, Any]] = None
+) -> Any:
+    """GET ``url`` and return its JSON body, served from ``cache`` when possible.
+
+    Only successful responses are cached.  ``httpx.HTTPError`` and
+    ``ValueError`` (invalid JSON) propagate to every coalesced caller.
+    """
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+    flight_key = (url, tuple(sorted(params.items())) if params else ())
+    task = _INFLIGHT.get(flight_key)
+    if task is None:
+
+        async def fetch() -> Any:
+            resp = await get_http_client().get(url, params=params)
+            resp.raise_for_status()
+            data = resp.json()
+            cache.set(key, data)
+            return data
+
+        task = asyncio.ensure_future(fetch())
+        _INFLIGHT[flight_key] = task
+        task.add_done_callback(lambda _: _INFLIGHT.pop(flight_key, None))
+    # Shield the shared task so that one cancelled caller does not cancel
+    # it for the others.
+    return await asyncio.shield(task)
+
+
 # ----------------------------
-# TEST session store (in-memory)
-# token -> {work_id: [ {role, content, ts} ]}
+# Session store: in-memory by default, shared through Redis when
+# ``REDIS_URL`` is set (see ``app/sessions.py``)
+# token -> {work_id: [ {role, content, ts} ]}, last MAX_HISTORY messages
 # ----------------------------
-CHAT_STORE: Dict[str, Dict[str, List[Dict[str, object]]]] = {}
+CHAT_STORE = create_chat_store()
+
+# Number of most recent messages returned by ``/chat`` (the full, bounded
+# history remains available from ``/history``).
+CHAT_RESPONSE_MESSAGES = 50
+
+# Seconds between two sweeps of idle sessions.
+SESSION_SWEEP_INTERVAL = 3600
+
+
+async def _sweep_idle_sessions() -> None:
+    """Periodically drop sessions that have been idle for too long."""
+    while True:
+        await asyncio.sleep(SESSION_SWEEP_INTERVAL)
+        try:
+            evicted = await CHAT_STORE.evict_idle()
+            if evicted:
+                logger.info("Evicted %d idle chat sessions", evicted)
+        except Exception as exc:  # keep sweeping on transient errors
+            logger.warning("Idle session sweep failed: %s", exc)
 
 
 @app.get("/", response_class=HTMLResponse)
@@ -107,37 +255,50 @@ async def index(request: Request) -> HTMLResponse:
 # ----------------------------
 # Session endpoints (required by your JS)
 # ----------------------------
+async def require_session(token: Optional[str]) -> str:
+    """Return ``token`` if it identifies a session, else raise a 401 error.
+
+    The store is queried once per request.  Unknown tokens are rejected
+    rather than implicitly creating a session.
+    """
+    if not await CHAT_STORE.has_session(token):
+        raise HTTPException(status_code=401, detail="Invalid token")
+    return token
+
+
+async def session_token(token: str) -> str:
+    """Dependency validating the ``token`` query parameter."""
+    return await require_session(token)
+
+
 @app.post("/session")
-def create_session() -> Dict[str, str]:
-    """Create a per-user session token (TEST)."""
-    token = uuid.uuid4().hex
-    CHAT_STORE[token] = {}
+async def create_session() -> Dict[str, str]:
+    """Create a per-user session token."""
+    token = await CHAT_STORE.create_session()
     return {"token": token}
 
 
 @app.get("/history")
-def get_history(work_id: str, token: str) -> Dict[str, object]:
+async def get_history(work_id: str, token: str = Depends(session_token)) -> Dict[str, object]:
     """Return the per-user chat history for a given book."""
-    if not token or token not in CHAT_STORE:
-        raise HTTPException(status_code=401, detail="Invalid token")
-    return {"work_id": work_id, "messages": CHAT_STORE[token].get(work_id, [])}
+    return {"work_id": work_id, "messages": await CHAT_STORE.get_history(token, work_id)}
 
 
 @app.post("/reset")
-def reset_history(payload: Dict[str, str]) -> Dict[str, str]:
+async def reset_history(payload: Dict[str, str]) -> Dict[str, str]:
     """Reset the per-user chat history for a given book."""
-    token = payload.get("token")
+    token = await require_session(payload.get("token"))
     work_id = payload.get("work_id")
-    if not token or token not in CHAT_STORE:
-        raise HTTPException(status_code=401, detail="Invalid token")
     if not work_id:
         raise HTTPException(status_code=400, detail="work_id required")
-    CHAT_STORE[token][work_id] = []
+    await CHAT_STORE.reset_history(token, work_id)
     return {"status": "ok"}
 
 
 @app.get("/search")
-def search_books(query: str, limit: int = 5) -> Dict[str, List[Dict[str, Optional[str]]]]:
+async def search_books(
+    query: str, response: Response, limit: int = 5
+) -> Dict[str, List[Dict[str, Optional[str]]]]:
     """Search for books using the Open Library search API.
 
     The endpoint accepts a search query and optional limit. It forwards
@@ -152,6 +313,8 @@ def search_books(query: str, limit: int = 5) -> Dict[str, List[Dict[str, Optiona
     ----------
     query: str
         Free-text query string.
+    response: Response
+        Used to set the ``Cache-Control`` header on Open Library results.
     limit: int, optional
         Maximum number of results to return (default 5).
 
@@ -166,9 +329,7 @@ def search_books(query: str, limit: int = 5) -> Dict[str, List[Dict[str, Optiona
     params = {"q": query, "limit": limit}
 
     try:
-        resp = requests.get(url, params=params, timeout=10)
-        resp.raise_for_status()
-        payload = resp.json()
+        payload = await _get_json_cached(SEARCH_CACHE, (query, limit), url, params)
         results: List[Dict[str, Optional[str]]] = []
 
         for doc in payload.get("docs", [])[:limit]:
@@ -183,36 +344,33 @@ def search_books(query: str, limit: int = 5) -> Dict[str, List[Dict[str, Optiona
                     "work_id": work_id,
                 }
             )
+        # Only genuine Open Library results may be kept by browsers/proxies
+        response.headers["Cache-Control"] = CACHE_CONTROL
         return {"results": results}
 
-    except requests.RequestException as exc:
+    except (httpx.HTTPError, ValueError) as exc:
         # If the remote API is unreachable (e.g., due to network restrictions),
         # fall back to searching the local sample dataset.
         logger.warning("Remote search failed (%s). Falling back to sample data.", exc)
         sample_results: List[Dict[str, Optional[str]]] = []
-        try:
-            with DATA_FILE.open("r", encoding="utf-8") as f:
-                books = json.load(f)
-            query_lower = query.lower()
-            for book in books:
-                title = (book.get("title") or "")
-                author = (book.get("author") or "")
-                if (query_lower in title.lower()) or (query_lower in author.lower()):
-                    sample_results.append(
-                        {
-                            "title": title,
-                            "author": author or None,
-                            "work_id": book.get("work_id"),
-                        }
-                    )
-                    if len(sample_results) >= limit:
-                        break
-        except Exception as e:
-            logger.error("Failed to read sample_books.json: %s", e)
+        query_lower = query.lower()
+        for title_lower, author_lower, book in zip(
+            _SAMPLE_TITLES_LOWER, _SAMPLE_AUTHORS_LOWER, _SAMPLE_BOOKS
+        ):
+            if (query_lower in title_lower) or (query_lower in author_lower):
+                sample_results.append(
+                    {
+                        "title": book.get("title") or "",
+                        "author": book.get("author") or None,
+                        "work_id": book.get("work_id"),
+                    }
+                )
+                if len(sample_results) >= limit:
+                    break
         return {"results": sample_results}
 
 
-def fetch_work(work_id: str) -> Dict:
+async def fetch_work(work_id: str) -> Dict:
     """Fetch information about a work from Open Library.
 
     Parameters
@@ -225,34 +383,30 @@ def fetch_work(work_id: str) -> Dict:
     Dict
         Parsed JSON response from the Open Library work endpoint.
     """
+    cached = WORK_CACHE.get(work_id)
+    if cached is not None:
+        return cached
     url = f"https://openlibrary.org/works/{work_id}.json"
     try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        return response.json()
-    except requests.RequestException as exc:
+        return await _get_json_cached(WORK_CACHE, work_id, url)
+    except (httpx.HTTPError, ValueError) as exc:
         # Fallback to local dataset when remote call fails
         logger.warning("Failed to fetch work %s remotely (%s); using local sample data.", work_id, exc)
-        try:
-            with DATA_FILE.open("r", encoding="utf-8") as f:
-                books = json.load(f)
-            for book in books:
-                if book.get("work_id") == work_id:
-                    # Convert sample data into a structure resembling Open Library's response.
-                    # We also include page_count and characters so that chat_with_book can
-                    # provide additional information without making further API calls.
-                    authors_list = book.get("authors") or []
-                    first_author = authors_list[0] if authors_list else ""
-                    return {
-                        "title": book.get("title"),
-                        "description": book.get("description"),
-                        "authors": [{"author": {"key": f"sample_author:{first_author}"}}],
-                        "subjects": book.get("subjects", []) or [],
-                        "page_count": book.get("page_count"),
-                        "characters": book.get("characters", []),
-                    }
-        except Exception as e:
-            logger.error("Failed to read sample_books.json: %s", e)
+        book = get_local_book(work_id)
+        if book is not None:
+            # Convert sample data into a structure resembling Open Library's response.
+            # We also include page_count and characters so that chat_with_book can
+            # provide additional information without making further API calls.
+            authors_list = book.get("authors") or []
+            first_author = authors_list[0] if authors_list else ""
+            return {
+                "title": book.get("title"),
+                "description": book.get("description"),
+                "authors": [{"author": {"key": f"sample_author:{first_author}"}}],
+                "subjects": book.get("subjects", []) or [],
+                "page_count": book.get("page_count"),
+                "characters": book.get("characters", []),
+            }
         raise HTTPException(status_code=503, detail="Failed to fetch book details")
 
 
@@ -264,8 +418,9 @@ def get_local_book(work_id: str) -> Optional[Dict]:
 
     The sample dataset provides a fallback when network requests to Open Library
     fail or when additional metadata such as page count and characters is
-    required. If the given work ID is found in the local data file,
-    the corresponding dictionary is returned; otherwise ``None`` is returned.
+    required. If the given work ID is found in the local data (loaded once at
+    startup), the corresponding dictionary is returned; otherwise ``None`` is
+    returned.
 
     Parameters
     ----------
@@ -277,18 +432,10 @@ def get_local_book(work_id: str) -> Optional[Dict]:
     Optional[Dict]
         A dictionary containing the book record, or ``None`` if not found.
     """
-    try:
-        with DATA_FILE.open("r", encoding="utf-8") as f:
-            books = json.load(f)
-        for book in books:
-            if book.get("work_id") == work_id:
-                return book
-    except Exception as exc:
-        logger.error("Failed to load local books data: %s", exc)
-    return None
+    return _SAMPLE_BY_WORK_ID.get(work_id)
 
 
-def fetch_author_name(author_key: str) -> Optional[str]:
+async def fetch_author_name(author_key: str) -> Optional[str]:
     """Fetch an author's name from Open Library using an author key.
 
     Parameters
@@ -305,19 +452,49 @@ def fetch_author_name(author_key: str) -> Optional[str]:
     # name directly without performing a network request.
     if author_key.startswith("sample_author:"):
         return author_key.split(":", 1)[1]
+    cached = AUTHOR_CACHE.get(author_key)
+    if cached is not None:
+        return cached.get("name")
     url = f"https://openlibrary.org{author_key}.json"
     try:
-        res = requests.get(url, timeout=10)
-        res.raise_for_status()
-        data = res.json()
+        data = await _get_json_cached(AUTHOR_CACHE, author_key, url)
         return data.get("name")
-    except requests.RequestException as exc:
+    except (httpx.HTTPError, ValueError) as exc:
         logger.warning("Failed to fetch author %s: %s", author_key, exc)
         return None
 
 
+async def fetch_page_count(work_id: str) -> Optional[int]:
+    """Return the page count of the first edition of a work, if known.
+
+    Parameters
+    ----------
+    work_id: str
+        The Open Library work identifier.
+
+    Returns
+    -------
+    Optional[int]
+        ``number_of_pages`` of the first edition listed by Open Library,
+        or ``None`` if unavailable or the request fails.
+    """
+    try:
+        editions_data = await _get_json_cached(
+            EDITIONS_CACHE,
+            work_id,
+            f"https://openlibrary.org/works/{work_id}/editions.json",
+            {"limit": 1},
+        )
+    except (httpx.HTTPError, ValueError):
+        return None
+    entries = editions_data.get("entries") or editions_data.get("docs") or []
+    if entries:
+        return entries[0].get("number_of_pages")
+    return None
+
+
 @app.get("/book/{work_id}")
-def get_book(work_id: str) -> Dict[str, object]:
+async def get_book(work_id: str, response: Response) -> Dict[str, object]:
     """Return details about a book given its work ID.
 
     This endpoint retrieves the work metadata from Open Library and
@@ -330,13 +507,20 @@ def get_book(work_id: str) -> Dict[str, object]:
     ----------
     work_id: str
         The Open Library work identifier.
+    response: Response
+        Used to set the ``Cache-Control`` header, unless the local
+        fallback answered.
 
     Returns
     -------
     Dict[str, Optional[str]]
         A dictionary with book metadata.
     """
-    data = fetch_work(work_id)
+    data = await fetch_work(work_id)
+    # Only a payload fetched from Open Library (and thus held by the work
+    # cache) is cacheable; the local fallback is not.
+    if WORK_CACHE.get(work_id) is data:
+        response.headers["Cache-Control"] = CACHE_CONTROL
     description = data.get("description")
     if isinstance(description, dict):
         description = description.get("value")
@@ -357,8 +541,195 @@ def get_book(work_id: str) -> Dict[str, object]:
     }
 
 
+# Keywords recognised by ``chat_with_book``, per question category.  Matching
+# is by substring of the lowercased message, and when several categories
+# are present the first one in this order wins.
+INTENT_KEYWORDS: Dict[str, List[str]] = {
+    "characters": ["personnage", "personnages", "character", "characters", "main character", "principaux", "principal"],
+    "summary": ["résumé", "resumé", "summary", "description", "synopsis", "resume"],
+    "author": ["auteur", "author", "écrivain", "writer", "written by"],
+    "pages": ["page", "pages", "nombre de pages", "how many pages"],
+    "themes": ["thème", "thèmes", "theme", "themes", "sujet", "sujets", "topics"],
+}
+
+# All keywords in one pattern, one named group per category.  The
+# alternation sits inside a lookahead so the scan tries every position of
+# the message and overlapping keywords are still found, exactly like the
+# substring tests it replaces, but in a single pass.
+_INTENT_RE = re.compile(
+    "(?={})".format(
+        "|".join(
+            "(?P<{}>{})".format(name, "|".join(map(re.escape, terms)))
+            for name, terms in INTENT_KEYWORDS.items()
+        )
+    )
+)
+
+
+# Words that mark a message as English (otherwise the bot answers in
+# French), also matched as substrings.  They overlap with the intent
+# keywords ("author", "summary"...), so they get a pattern of their own.
+EN_HINTS: List[str] = ["summary", "author", "characters", "who", "what", "theme"]
+_EN_HINT_RE = re.compile("|".join(map(re.escape, EN_HINTS)))
+
+
+def detect_intents(lower_msg: str) -> Set[str]:
+    """Return the categories of ``INTENT_KEYWORDS`` found in a lowercased message."""
+    return {m.lastgroup for m in _INTENT_RE.finditer(lower_msg)}
+
+
+def classify(lower_msg: str) -> Optional[str]:
+    """Return the category a lowercased message asks about, or ``None``.
+
+    When several categories are present, the first one in
+    ``INTENT_KEYWORDS`` wins.
+    """
+    intents = detect_intents(lower_msg)
+    return next((name for name in INTENT_KEYWORDS if name in intents), None)
+
+
+class BookContext(NamedTuple):
+    """What ``chat_with_book`` knows about a book, remote and local merged."""
+
+    title: str
+    # Local description if any (often better), else the Open Library one
+    description: Optional[str]
+    # Local-only metadata
+    page_count: Optional[int]
+    characters: List[str]
+    # Open Library subjects, else the local ones
+    subjects: List[str]
+    author_keys: List[str]
+    # Local author names, used when the Open Library lookups fail
+    local_authors: List[str]
+
+
+# work_id -> (work payload, BookContext).  An entry is reused only while
+# ``fetch_work`` keeps returning the very same (cached) payload, so the
+# context is rebuilt whenever the work is refetched or served by the
+# local fallback.
+_BOOK_CONTEXTS = TTLCache(maxsize=1024, ttl=3600)
+
+
+def book_context(work_id: str, data: Dict) -> BookContext:
+    """Return the ``BookContext`` of ``work_id`` built from its work ``data``."""
+    cached = _BOOK_CONTEXTS.get(work_id)
+    if cached is not None and cached[0] is data:
+        return cached[1]
+
+    # Normalize description if it is a dict
+    description: Optional[str] = data.get("description")
+    if isinstance(description, dict):
+        description = description.get("value")
+
+    author_keys: List[str] = []
+    for auth in data.get("authors", []):
+        if isinstance(auth, dict) and "author" in auth:
+            key = auth.get("author", {}).get("key")
+            if key:
+                author_keys.append(key)
+
+    # Also use local metadata if available (page_count, characters, maybe better description)
+    local_book = get_local_book(work_id) or {}
+
+    ctx = BookContext(
+        title=data.get("title", "cet ouvrage"),
+        description=local_book.get("description") or description,
+        page_count=local_book.get("page_count"),
+        characters=local_book.get("characters", []),
+        subjects=(data.get("subjects") or []) or (local_book.get("subjects", []) or []),
+        author_keys=author_keys,
+        local_authors=local_book.get("authors", []),
+    )
+    _BOOK_CONTEXTS.set(work_id, (data, ctx))
+    return ctx
+
+
+@lru_cache(maxsize=1024)
+def trim(text: str, max_len: int = 500) -> str:
+    """Shorten ``text`` to at most ``max_len`` characters on a word boundary."""
+    t = (text or "").strip()
+    if len(t) <= max_len:
+        return t
+    t = t[:max_len]
+    if " " in t:
+        t = t.rsplit(" ", 1)[0]
+    return t + "…"
+
+
+# ----------------------------
+# Answer formatters, one per question category.  Each takes the book
+# context and the answer language ("fr" or "en").
+# ----------------------------
+async def _answer_characters(ctx: BookContext, lang: str) -> str:
+    title = ctx.title
+    if ctx.characters:
+        if lang == "en":
+            return f"Main characters in {title}: {', '.join(ctx.characters)}"
+        return f"Personnages principaux de {title} : {', '.join(ctx.characters)}"
+    return f"Sorry, I don't have the main characters for {title}." if lang == "en" else f"Désolé, je n'ai pas les personnages principaux de {title}."
+
+
+async def _answer_summary(ctx: BookContext, lang: str) -> str:
+    title = ctx.title
+    if ctx.description:
+        trimmed = trim(ctx.description, 500)
+        return f"Summary of {title}: {trimmed}" if lang == "en" else f"Résumé de {title} : {trimmed}"
+    return f"Sorry, I can't find a summary for {title}." if lang == "en" else f"Je suis désolé, je ne trouve pas de résumé pour {title}."
+
+
+async def _answer_author(ctx: BookContext, lang: str) -> str:
+    title = ctx.title
+    # Resolve all authors concurrently rather than one after another.
+    found = await asyncio.gather(*(fetch_author_name(key) for key in ctx.author_keys))
+    names: List[str] = [name for name in found if name]
+
+    # If no names found via Open Library, use local authors
+    if not names:
+        names = ctx.local_authors
+
+    if names:
+        return f"Author(s) of {title}: {', '.join(names)}" if lang == "en" else f"Auteur(s) de {title} : {', '.join(names)}"
+    return f"Sorry, I can't find the author of {title}." if lang == "en" else f"Je suis désolé, je ne trouve pas d'information sur l'auteur de {title}."
+
+
+async def _answer_pages(ctx: BookContext, lang: str) -> str:
+    title = ctx.title
+    pages = ctx.page_count
+    if pages:
+        return f"{title} is about {pages} pages." if lang == "en" else f"Le livre {title} comporte environ {pages} pages."
+    return f"Sorry, I don't have the page count for {title}." if lang == "en" else f"Désolé, je ne dispose pas du nombre de pages pour {title}."
+
+
+async def _answer_themes(ctx: BookContext, lang: str) -> str:
+    title = ctx.title
+    if ctx.subjects:
+        top = ctx.subjects[:8]
+        return f"Main themes/topics in {title}: {', '.join(top)}" if lang == "en" else f"Thèmes/sujets principaux de {title} : {', '.join(top)}"
+    return f"Sorry, I don't have themes for {title}." if lang == "en" else f"Désolé, je n'ai pas de thèmes pour {title}."
+
+
+async def _answer_default(ctx: BookContext, lang: str) -> str:
+    # Generic fallback: use local or remote description, truncated
+    if ctx.description:
+        return trim(ctx.description, 500)
+    title = ctx.title
+    return f"Sorry, I don't have enough information about {title}." if lang == "en" else f"Désolé, je n'ai pas suffisamment d'informations pour répondre à votre question sur {title}."
+
+
+# Category (see ``INTENT_KEYWORDS``) -> formatter; anything else gets
+# ``_answer_default``.
+HANDLERS: Dict[str, Callable[[BookContext, str], Awaitable[str]]] = {
+    "characters": _answer_characters,
+    "summary": _answer_summary,
+    "author": _answer_author,
+    "pages": _answer_pages,
+    "themes": _answer_themes,
+}
+
+
 @app.post("/chat")
-def chat_with_book(payload: Dict[str, str]) -> Dict[str, object]:
+async def chat_with_book(payload: Dict[str, str]) -> Dict[str, object]:
     """Handle a chat message about a book.
 
     The caller must supply a JSON object with:
@@ -376,148 +747,49 @@ def chat_with_book(payload: Dict[str, str]) -> Dict[str, object]:
     Returns
     -------
     Dict[str, object]
-        { "answer": str, "messages": [...] }
+        { "answer": str, "messages": [...] }, with the last
+        ``CHAT_RESPONSE_MESSAGES`` messages of the conversation.
     """
-    token = payload.get("token")
+    token = await require_session(payload.get("token"))
     message = payload.get("message")
     work_id = payload.get("work_id")
 
-    if not token or token not in CHAT_STORE:
-        raise HTTPException(status_code=401, detail="Invalid token")
     if not message or not work_id:
         raise HTTPException(status_code=400, detail="Both 'message' and 'work_id' are required.")
 
-    # Init history for this token/work
-    CHAT_STORE[token].setdefault(work_id, [])
-    CHAT_STORE[token][work_id].append({"role": "user", "content": message, "ts": time.time()})
-
-    # Load book data from remote or fallback
-    data = fetch_work(work_id)
-    title: str = data.get("title", "cet ouvrage")
-
-    # Normalize description if it is a dict
-    description: Optional[str] = data.get("description")
-    if isinstance(description, dict):
-        description = description.get("value")
-
-    # Also load local metadata if available (page_count, characters, maybe better description)
-    local_book = get_local_book(work_id)
-    local_description: Optional[str] = None
-    local_page_count: Optional[int] = None
-    local_characters: List[str] = []
-    local_subjects: List[str] = []
-
-    if local_book:
-        local_description = local_book.get("description")
-        local_page_count = local_book.get("page_count")
-        local_characters = local_book.get("characters", [])
-        local_subjects = local_book.get("subjects", []) or []
+    # Record the question in this token/work history
+    await CHAT_STORE.append_messages(
+        token, work_id, {"role": "user", "content": message, "ts": time.time_ns() // 1_000_000}
+    )
 
     # Lowercase message for keyword matching
     lower_msg = message.lower()
-    answer = ""
+    intent = classify(lower_msg)
+
+    # Load book data from remote or fallback.  A page-count question that
+    # the local data cannot answer also needs the editions lookup, which is
+    # then sent concurrently instead of after the work.
+    local_book = get_local_book(work_id)
+    if intent == "pages" and not (local_book and local_book.get("page_count")):
+        data, remote_page_count = await asyncio.gather(
+            fetch_work(work_id), fetch_page_count(work_id)
+        )
+        # The local data has no page count here; use the first edition's
+        ctx = book_context(work_id, data)._replace(page_count=remote_page_count)
+    else:
+        data = await fetch_work(work_id)
+        ctx = book_context(work_id, data)
 
     # Simple language detection (FR vs EN)
-    lang = "en" if any(w in lower_msg for w in ["summary", "author", "characters", "who", "what", "theme"]) else "fr"
-
-    # Helpers
-    def trim(text: str, max_len: int = 500) -> str:
-        t = (text or "").strip()
-        if len(t) <= max_len:
-            return t
-        t = t[:max_len]
-        if " " in t:
-            t = t.rsplit(" ", 1)[0]
-        return t + "…"
-
-    # Determine if user asks for main characters
-    if any(term in lower_msg for term in ["personnage", "personnages", "character", "characters", "main character", "principaux", "principal"]):
-        if local_characters:
-            if lang == "en":
-                answer = f"Main characters in {title}: {', '.join(local_characters)}"
-            else:
-                answer = f"Personnages principaux de {title} : {', '.join(local_characters)}"
-        else:
-            answer = f"Sorry, I don't have the main characters for {title}." if lang == "en" else f"Désolé, je n'ai pas les personnages principaux de {title}."
-
-    # Determine if user asks for a summary/description
-    elif any(term in lower_msg for term in ["résumé", "resumé", "summary", "description", "synopsis", "resume"]):
-        desc = local_description or description
-        if desc:
-            trimmed = trim(desc, 500)
-            answer = f"Summary of {title}: {trimmed}" if lang == "en" else f"Résumé de {title} : {trimmed}"
-        else:
-            answer = f"Sorry, I can't find a summary for {title}." if lang == "en" else f"Je suis désolé, je ne trouve pas de résumé pour {title}."
-
-    # Determine if user asks about the author(s)
-    elif any(term in lower_msg for term in ["auteur", "author", "écrivain", "writer", "written by"]):
-        author_keys = [
-            auth.get("author", {}).get("key")
-            for auth in data.get("authors", [])
-            if isinstance(auth, dict) and "author" in auth
-        ]
-        names: List[str] = []
-        for key in author_keys:
-            if key:
-                name = fetch_author_name(key)
-                if name:
-                    names.append(name)
-
-        # If no names found via Open Library, use local authors
-        if not names and local_book:
-            names = local_book.get("authors", [])
-
-        if names:
-            answer = f"Author(s) of {title}: {', '.join(names)}" if lang == "en" else f"Auteur(s) de {title} : {', '.join(names)}"
-        else:
-            answer = f"Sorry, I can't find the author of {title}." if lang == "en" else f"Je suis désolé, je ne trouve pas d'information sur l'auteur de {title}."
-
-    # Determine if user asks about page count
-    elif any(t in lower_msg for t in ["page", "pages", "nombre de pages", "how many pages"]):
-        pages: Optional[int] = None
-
-        # First try local data
-        if local_page_count:
-            pages = local_page_count
-
-        # If not available, fetch edition info from remote API
-        if pages is None:
-            try:
-                editions_resp = requests.get(
-                    f"https://openlibrary.org/works/{work_id}/editions.json?limit=1",
-                    timeout=10,
-                )
-                editions_resp.raise_for_status()
-                editions_data = editions_resp.json()
-                entries = editions_data.get("entries") or editions_data.get("docs") or []
-                if entries:
-                    edition = entries[0]
-                    pages = edition.get("number_of_pages")
-            except requests.RequestException:
-                pages = None
-
-        if pages:
-            answer = f"{title} is about {pages} pages." if lang == "en" else f"Le livre {title} comporte environ {pages} pages."
-        else:
-            answer = f"Sorry, I don't have the page count for {title}." if lang == "en" else f"Désolé, je ne dispose pas du nombre de pages pour {title}."
-
-    # Themes / subjects
-    elif any(t in lower_msg for t in ["thème", "thèmes", "theme", "themes", "sujet", "sujets", "topics"]):
-        subjects = (data.get("subjects") or []) or local_subjects
-        if subjects:
-            top = subjects[:8]
-            answer = f"Main themes/topics in {title}: {', '.join(top)}" if lang == "en" else f"Thèmes/sujets principaux de {title} : {', '.join(top)}"
-        else:
-            answer = f"Sorry, I don't have themes for {title}." if lang == "en" else f"Désolé, je n'ai pas de thèmes pour {title}."
+    lang = "en" if _EN_HINT_RE.search(lower_msg) else "fr"
 
-    else:
-        # Generic fallback: use local or remote description, truncated
-        desc = local_description or description
-        if desc:
-            answer = trim(desc, 500)
-        else:
-            answer = f"Sorry, I don't have enough information about {title}." if lang == "en" else f"Désolé, je n'ai pas suffisamment d'informations pour répondre à votre question sur {title}."
+    answer = await HANDLERS.get(intent, _answer_default)(ctx, lang)
 
     # Save assistant message
-    CHAT_STORE[token][work_id].append({"role": "assistant", "content": answer, "ts": time.time()})
-    return {"answer": answer, "messages": CHAT_STORE[token][work_id]}
+    await CHAT_STORE.append_messages(
+        token, work_id, {"role": "assistant", "content": answer, "ts": time.time_ns() // 1_000_000}
+    )
+    return {
+        "answer": answer,
+        "messages": await CHAT_STORE.get_history(token, work_id, limit=CHAT_RESPONSE_MESSAGES),
+    }
@@ -0,0 +1,201 @@
+"""
+Chat session and history storage for the chatbot.
+
+A session is an opaque token created by ``POST /session``.  For every
+session the store keeps one chat history per book (``work_id``), as a
+list of ``{role, content, ts}`` messages, ``ts`` being an integer
+number of milliseconds since the Unix epoch.
+
+Two backends are provided:
+
+* ``InMemoryChatStore`` keeps everything in a process-local dict.  It
+  needs no extra service but only works with a single uvicorn worker,
+  and sessions are lost on restart.
+
+* ``RedisChatStore`` keeps sessions and histories in Redis so that
+  several workers (``uvicorn --workers N``) share them.
+
+With either backend a history keeps only its last ``MAX_HISTORY``
+messages, and sessions unused for ``SESSION_TTL`` seconds are dropped
+(by Redis key expiry, or by ``evict_idle()`` for the in-memory store).
+
+``create_chat_store()`` picks the Redis backend when the ``REDIS_URL``
+environment variable is set and the optional ``redis`` package is
+installed, and falls back to the in-memory store otherwise.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Deque, Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# Lifetime of an idle session (and its histories).
+SESSION_TTL = 86400
+
+# Messages kept per history; older ones are discarded.
+MAX_HISTORY = 200
+
+Message = Dict[str, object]
+
+
+class InMemoryChatStore:
+    """Process-local session store (single worker only).
+
+    Parameters
+    ----------
+    ttl : float
+        Seconds after which an unused session is dropped by
+        ``evict_idle()``.
+    max_history : int
+        Messages kept per history.
+    """
+
+    def __init__(self, ttl: float = SESSION_TTL, max_history: int = MAX_HISTORY) -> None:
+        # token -> {work_id: deque([ {role, content, ts} ])}
+        self._sessions: Dict[str, Dict[str, Deque[Message]]] = {}
+        # token -> monotonic time of last use, least recently used first
+        self._last_seen: "OrderedDict[str, float]" = OrderedDict()
+        self._ttl = ttl
+        self._max_history = max_history
+
+    def _touch(self, token: str) -> None:
+        self._last_seen[token] = time.monotonic()
+        self._last_seen.move_to_end(token)
+
+    async def create_session(self) -> str:
+        """Create a new session and return its token."""
+        token = uuid.uuid4().hex
+        self._sessions[token] = {}
+        self._touch(token)
+        return token
+
+    async def has_session(self, token: Optional[str]) -> bool:
+        """Return whether ``token`` identifies an existing session.
+
+        A successful check counts as a use of the session.
+        """
+        if not token or token not in self._sessions:
+            return False
+        self._touch(token)
+        return True
+
+    async def get_history(self, token: str, work_id: str, limit: Optional[int] = None) -> List[Message]:
+        """Return the messages exchanged about ``work_id``, oldest first.
+
+        With ``limit``, only the last ``limit`` messages are returned.
+        """
+        history = list(self._sessions.get(token, {}).get(work_id, ()))
+        return history[-limit:] if limit else history
+
+    async def append_messages(self, token: str, work_id: str, *messages: Message) -> None:
+        """Append ``messages`` to the history of ``work_id``."""
+        works = self._sessions.setdefault(token, {})
+        history = works.get(work_id)
+        if history is None:
+            history = works[work_id] = deque(maxlen=self._max_history)
+        history.extend(messages)
+
+    async def reset_history(self, token: str, work_id: str) -> None:
+        """Clear the history of ``work_id``."""
+        self._sessions.setdefault(token, {})[work_id] = deque(maxlen=self._max_history)
+
+    async def evict_idle(self) -> int:
+        """Drop the sessions unused for ``ttl`` seconds; return how many."""
+        cutoff = time.monotonic() - self._ttl
+        evicted = 0
+        while self._last_seen:
+            token, seen = next(iter(self._last_seen.items()))
+            if seen > cutoff:
+                break
+            self._last_seen.popitem(last=False)
+            self._sessions.pop(token, None)
+            evicted += 1
+        return evicted
+
+    async def close(self) -> None:
+        """Release resources (nothing to do for this backend)."""
+
+
+class RedisChatStore:
+    """Session store shared by all workers through Redis.
+
+    Parameters
+    ----------
+    url : str
+        Redis connection URL, e.g. ``redis://localhost:6379/0``.
+    ttl : int
+        Seconds after which an unused session and its histories expire.
+    max_history : int
+        Messages kept per history.
+    """
+
+    def __init__(self, url: str, ttl: int = SESSION_TTL, max_history: int = MAX_HISTORY) -> None:
+        import redis.asyncio as redis_asyncio
+
+        self._redis = redis_asyncio.from_url(url, decode_responses=True)
+        self._ttl = ttl
+        self._max_history = max_history
+
+    @staticmethod
+    def _session_key(token: str) -> str:
+        return f"session:{token}"
+
+    @staticmethod
+    def _history_key(token: str, work_id: str) -> str:
+        return f"chat:{token}:{work_id}"
+
+    async def create_session(self) -> str:
+        token = uuid.uuid4().hex
+        await self._redis.set(self._session_key(token), "1", ex=self._ttl)
+        return token
+
+    async def has_session(self, token: Optional[str]) -> bool:
+        if not token:
+            return False
+        # As with the in-memory store, a successful check counts as a use:
+        # refresh the TTL.  EXPIRE returns 0 when the key does not exist.
+        return bool(await self._redis.expire(self._session_key(token), self._ttl))
+
+    async def get_history(self, token: str, work_id: str, limit: Optional[int] = None) -> List[Message]:
+        start = -limit if limit else 0
+        raw = await self._redis.lrange(self._history_key(token, work_id), start, -1)
+        return [json.loads(item) for item in raw]
+
+    async def append_messages(self, token: str, work_id: str, *messages: Message) -> None:
+        key = self._history_key(token, work_id)
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.rpush(key, *(json.dumps(m, ensure_ascii=False) for m in messages))
+            pipe.ltrim(key, -self._max_history, -1)
+            pipe.expire(key, self._ttl)
+            # Any activity keeps the session itself alive as well.
+            pipe.expire(self._session_key(token), self._ttl)
+            await pipe.execute()
+
+    async def reset_history(self, token: str, work_id: str) -> None:
+        await self._redis.delete(self._history_key(token, work_id))
+
+    async def evict_idle(self) -> int:
+        # Redis expires idle keys by itself.
+        return 0
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+
+def create_chat_store() -> Union[InMemoryChatStore, RedisChatStore]:
+    """Return the Redis store if ``REDIS_URL`` is set, else the in-memory one."""
+    url = os.environ.get("REDIS_URL")
+    if url:
+        try:
+            return RedisChatStore(url)
+        except ImportError:
+            logger.warning("REDIS_URL is set but the 'redis' package is not installed; "
+                           "using the in-memory session store.")
+    return InMemoryChatStore()